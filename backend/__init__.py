@@ -1,18 +1,34 @@
 from flask import Flask
 from flask_cors import CORS
+from flask_jwt_extended import JWTManager
 from config import Config
+from config.logger import configure_logging
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    configure_logging(
+        level=app.config.get('LOG_LEVEL', 'INFO'),
+        debug_sample_rate=app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+    )
     CORS(app)
+    JWTManager(app)
 
     # Initialize extensions
     from auth import db
+    if app.config.get('MONGODB_ENSURE_INDEXES'):
+        from config.indexes import ensure_indexes
+        ensure_indexes(db)
+    
+    if app.config.get('EVENTS_RELAY') == 'mongo':
+        from events import start_relay
+        start_relay()
     
     # Register blueprints
     from user.routes import user_bp
     app.register_blueprint(user_bp, url_prefix='/user')
+    from routes.events import events_bp
+    app.register_blueprint(events_bp, url_prefix='/api/events')
 
     @app.route('/')
     def index():
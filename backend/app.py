@@ -2,14 +2,25 @@ from __init__ import create_app
 from flask_cors import CORS
 from flask import request, jsonify
 import numpy as np
-import pandas as pd
-import pickle
-import os
-import difflib
 from config import Config
+from config.logger import get_logger
+from inference import (ARTIFACT_DIR, BundleError, PredictionCache, add_reload_listener, get_engine,
+                       list_versions, reload_engine, start_watcher)
+import hmac
+from functools import wraps
 
 app = create_app()
 
+# Whole /predict responses keyed on the matched symptom set; cleared
+# whenever the model files or datasets are reloaded
+prediction_cache = PredictionCache(
+    maxsize=app.config.get('PREDICT_CACHE_SIZE', 1024),
+    ttl=app.config.get('PREDICT_CACHE_TTL', 300)
+)
+add_reload_listener(lambda engine: prediction_cache.clear())
+
+logger = get_logger('predict')
+
 # Configure CORS - simpler configuration
 CORS(app)
 
@@ -18,7 +29,7 @@ from user import routes
 
 # load databasedataset===================================
 class Recommendation:
-    def __init__(self, input_symptoms):
+    def __init__(self, input_symptoms, top_k=None):
         # Modify how we handle input symptoms
         if isinstance(input_symptoms, str):
             # Split by comma and clean up each symptom
@@ -30,212 +41,401 @@ class Recommendation:
         else:
             self.input_symptoms = [input_symptoms]
 
-        print("Processed input symptoms:", self.input_symptoms)  # Debug log
+        logger.debug("Processed %d input symptoms", len(self.input_symptoms))
 
-        # Use relative paths instead of hardcoded paths
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Load model files
-        self.model = pickle.load(open(os.path.join(current_dir, "model.pkl"), "rb"))
-        self.le = pickle.load(open(os.path.join(current_dir, "encoder.pkl"), "rb"))  
-        self.columns = pickle.load(open(os.path.join(current_dir, "col.pkl"), "rb"))
-        
-        # Load dataset files
-        self.dataset_diets = pd.read_csv(os.path.join(current_dir, "data sets", "diets.csv"))
-        self.dataset_description = pd.read_csv(os.path.join(current_dir, "data sets", "description.csv"))
-        self.dataset_medication = pd.read_csv(os.path.join(current_dir, "data sets", "medications.csv"))
-        self.dataset_precautions = pd.read_csv(os.path.join(current_dir, "data sets", "precautions_df.csv"))
+        # Model files and datasets are loaded once per process and shared
+        self.engine = get_engine()
         
-        # Clean up datasets
-        if "Unnamed: 0" in self.dataset_precautions.columns:
-            self.dataset_precautions = self.dataset_precautions.drop(columns=["Unnamed: 0"], axis=1)
-        
-        self.disease = self.predict()
+        self.symptom_indices = self.match_symptoms()
+        self.top_k = top_k
+        self.disease = None
+        self.risk = None
+        self.differential = None
     
     def find_closest_symptom(self, symptom):
         """
-        Find the closest matching symptom in our dataset.
+        Find the closest matching symptom in our dataset and return its
+        column index, or None if nothing is close enough.
         """
-        # Clean up the input symptom
-        symptom = symptom.strip().lower()
-        # Replace underscores with spaces for matching
-        symptom = symptom.replace('_', ' ')
-        
-        print(f"Finding match for symptom: {symptom}")  # Debug log
-        #print(f"Available columns: {self.columns}")  # Debug log
+        index = self.engine.matcher.match(symptom)
         
-        # Get matches with a cutoff of 0.6 (adjust this value if needed)
-        matches = difflib.get_close_matches(symptom, self.columns, n=1, cutoff=0.6)
-        
-        if matches:
-            print(f"Found match: {matches[0]} for input: {symptom}")  # Debug log
-            return matches[0]
+        if index is not None:
+            logger.debug("Found match: %s for input: %s", self.engine.columns[index], symptom)
         else:
-            print(f"No match found for: {symptom}")  # Debug log
-            return None
+            logger.debug("No match found for: %s", symptom)
+        return index
+
+    def match_symptoms(self):
+        """
+        Resolve the input symptoms to a sorted tuple of distinct column
+        indices. This is also the canonical cache key for the request.
+        """
+        indices = set()
+        for symptom in self.input_symptoms:
+            if not symptom:  # Skip empty symptoms
+                continue
+            
+            index = self.find_closest_symptom(symptom)
+            if index is not None:
+                indices.add(index)
+        return tuple(sorted(indices))
 
     def predict(self):
         try:
-            if not self.input_symptoms or all(not s for s in self.input_symptoms):
-                print("No valid symptoms provided")
-                return None
-
-            input_vector = np.zeros(len(self.columns))
-            matched_symptoms = []
-
-            for symptom in self.input_symptoms:
-                if not symptom:  # Skip empty symptoms
-                    continue
-                
-                matched_symptom = self.find_closest_symptom(symptom)
-                if matched_symptom:
-                    index = np.where(self.columns == matched_symptom)[0][0]
-                    input_vector[index] = 1
-                    matched_symptoms.append(f"Matched '{symptom}' to '{matched_symptom}'")
-                else:
-                    print(f"Warning: Could not find close match for symptom '{symptom}'")
-
-            if not matched_symptoms:
-                print("No symptoms could be matched")
+            if not self.symptom_indices:
+                logger.debug("No symptoms could be matched")
                 return None
 
-            print("Matched symptoms:", matched_symptoms)  # Debug log
+            input_vector = np.zeros((1, len(self.engine.columns)))
+            input_vector[0, list(self.symptom_indices)] = 1
+            if self.top_k:
+                # The most likely disease heads the differential, so one
+                # probability call answers both
+                self.differential = self.engine.differential(input_vector, self.top_k)[0]
+                self.disease = self.differential[0]['disease']
+            else:
+                self.disease = self.engine.predict(input_vector)
+            self.risk = self.engine.severity.assess(input_vector)[0]
+            logger.debug("Predicted disease: %s", self.disease)
+            return self.disease
             
-            # Use shape parameter instead of newshape
-            input_vector = np.reshape(input_vector, shape=(1, -1))
-            prediction = self.le.inverse_transform(self.model.predict(input_vector))[0]
-            print(f"Predicted disease: {prediction}")
-            return prediction
-            
-        except Exception as e:
-            print(f"Error in predict method: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in predict method")
             return None
     
-    def clean_list_data(self, data):
-        if isinstance(data, (list, np.ndarray)):
-            return [str(item).strip() for item in data if item is not None and str(item).lower() != 'nan']
-        elif isinstance(data, str):
-            if data.startswith('[') and data.endswith(']'):
-                try:
-                    import ast
-                    parsed = ast.literal_eval(data)
-                    if isinstance(parsed, list):
-                        return [str(item).strip() for item in parsed if item is not None]
-                except:
-                    pass
-            return [data.strip()]
-        return []
-
     def get_diet(self):
-        if self.disease not in self.dataset_diets["Disease"].values:
-            return ["No diet info found"]
-        diet_data = self.dataset_diets[self.dataset_diets["Disease"] == self.disease].iloc[:, 1:].values[0][0]
-        return self.clean_list_data(diet_data)
+        return self.engine.knowledge.details(self.disease)['diet']
     
     def get_description(self):
-        if self.disease not in self.dataset_description["Disease"].values:
-            return "No description found"
-        return str(self.dataset_description[self.dataset_description["Disease"] == self.disease].iloc[:, 1:].values[0][0])
+        return self.engine.knowledge.details(self.disease)['description']
     
     def get_medication(self):
-        if self.disease not in self.dataset_medication["Disease"].values:
-            return ["No medication info found"]
-        med_data = self.dataset_medication[self.dataset_medication["Disease"] == self.disease].iloc[:, 1:].values[0][0]
-        return self.clean_list_data(med_data)
+        return self.engine.knowledge.details(self.disease)['medications']
     
     def get_precautions(self):
         """
         Get precautions for a specific disease.
         """
-        if self.disease not in self.dataset_precautions["Disease"].values:
-            return ["No specific precautions found for this condition"]
-            
-        precaution_data = self.dataset_precautions[self.dataset_precautions["Disease"] == self.disease].iloc[:, 1:].values[0]
-        return self.clean_list_data(precaution_data)
+        return self.engine.knowledge.details(self.disease)['precautions']
+
+    def get_workouts(self):
+        return self.engine.knowledge.details(self.disease)['workouts']
 
 
 
+def parse_top_k(value):
+    """
+    Validate the optional top_k request field. Returns (k, error); k is
+    None when no differential was asked for.
+    """
+    if value is None:
+        return None, None
+    limit = app.config.get('PREDICT_TOP_K_MAX', 10)
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= limit:
+        return None, f'top_k must be an integer between 1 and {limit}'
+    return value, None
+
+
+def report_risk(risk):
+    """
+    Log a high-risk prediction. Called for every prediction served,
+    cached or not, so each high-risk case is flagged.
+    """
+    if risk['high_risk']:
+        logger.warning("High-risk case: severity score %d, suggested emergency priority %s",
+                       risk['score'], risk['level'])
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        print("\n=== New Prediction Request ===")
-        print("Received request headers:", request.headers)
-        raw_data = request.get_data()
-        print("Raw request data:", raw_data.decode('utf-8'))
-
         if not request.is_json:
-            print("Request is not JSON")
             return jsonify({
                 'error': 'Content-Type must be application/json'
             }), 415
 
         data = request.get_json()
-        print("Parsed JSON data:", data)
         
         if not data or 'symptoms' not in data:
-            print("No symptoms in request data")
             return jsonify({
                 'error': 'No symptoms provided in request'
             }), 400
 
         symptoms = data.get('symptoms', '').strip()
-        additional_info = data.get('additional_info', '').strip()
-        print(f"Extracted symptoms: {symptoms}")
-        print(f"Additional info: {additional_info}")
         
         if not symptoms:
-            print("Empty symptoms string")
             return jsonify({
                 'error': 'Empty symptoms string provided'
             }), 400
 
         # Split symptoms by comma and clean them
         symptom_list = [s.strip() for s in symptoms.split(',') if s.strip()]
-        print("Processed symptom list:", symptom_list)
         
         if not symptom_list:
-            print("No valid symptoms after processing")
             return jsonify({
                 'error': 'No valid symptoms found after processing'
             }), 400
 
+        top_k, error = parse_top_k(data.get('top_k'))
+        if error:
+            return jsonify({'error': error}), 400
+
         try:
-            recommendation = Recommendation(symptoms)
+            recommendation = Recommendation(symptoms, top_k=top_k)
+            
+            # Responses are cached on the matched symptom set, so different
+            # spellings of the same symptoms share an entry
+            cache_key = (recommendation.engine.generation, recommendation.symptom_indices, top_k)
+            response_data = prediction_cache.get(cache_key) if recommendation.symptom_indices else None
+            if response_data is not None:
+                logger.debug("Serving cached prediction")
+                report_risk(response_data['risk'])
+                return jsonify(response_data)
             
-            if not recommendation.disease:
-                print("Could not predict disease")
+            if not recommendation.predict():
                 return jsonify({
                     'error': 'Could not predict disease from provided symptoms'
                 }), 500
                 
             response_data = {
                 'predicted_disease': recommendation.disease,
+                'model_version': recommendation.engine.version,
+                'risk': recommendation.risk,
                 'description': recommendation.get_description(),
                 'medications': recommendation.get_medication(),
                 'diet': recommendation.get_diet(),
-                'precautions': recommendation.get_precautions()
+                'precautions': recommendation.get_precautions(),
+                'workouts': recommendation.get_workouts()
             }
+            if recommendation.differential is not None:
+                response_data['differential'] = recommendation.differential
+            prediction_cache.put(cache_key, response_data)
 
-            print("Sending response:", response_data)
+            logger.debug("Predicted %s from %d matched symptoms", recommendation.disease, len(recommendation.symptom_indices))
+            report_risk(recommendation.risk)
             return jsonify(response_data)
             
         except Exception as model_error:
-            print("Error in model prediction:", str(model_error))
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in model prediction")
             return jsonify({
                 'error': f'Error in model prediction: {str(model_error)}'
             }), 500
 
     except Exception as e:
-        print("Error occurred:", str(e))
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error handling prediction request")
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+def admin_only(view):
+    """
+    Refuse the request with 403 unless the X-Admin-Token header matches
+    MODEL_ADMIN_TOKEN. With no token configured every request is refused.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admin_token = app.config.get('MODEL_ADMIN_TOKEN')
+        if not admin_token or not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+            return jsonify({'error': 'Forbidden'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/predict/cache', methods=['GET'])
+@admin_only
+def predict_cache_stats():
+    return jsonify(prediction_cache.stats())
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Predict several symptom sets in one request. Expects
+    {"cases": ["fever, headache", ["cough", "chills"], ...]} and returns
+    one result per case, in order.
+    """
+    if not request.is_json:
+        return jsonify({
+            'error': 'Content-Type must be application/json'
+        }), 415
+
+    data = request.get_json()
+    cases = data.get('cases') if isinstance(data, dict) else None
+    if not isinstance(cases, list) or not cases:
+        return jsonify({
+            'error': 'No cases provided in request'
+        }), 400
+
+    top_k, error = parse_top_k(data.get('top_k'))
+    if error:
+        return jsonify({'error': error}), 400
+
+    limit = app.config.get('PREDICT_BATCH_LIMIT', 1000)
+    if len(cases) > limit:
+        return jsonify({
+            'error': f'Too many cases in one batch (max {limit})'
+        }), 413
+
+    try:
+        engine = get_engine()
+
+        index_sets = []
+        for case in cases:
+            if isinstance(case, str):
+                symptoms = case.split(',')
+            elif isinstance(case, list):
+                symptoms = [str(s) for s in case]
+            else:
+                symptoms = []
+            index_sets.append(engine.encode(s for s in symptoms if s.strip()))
+
+        # Only cases with at least one matched symptom go to the model
+        predictable = [i for i, indices in enumerate(index_sets) if indices]
+        # The same input matrix feeds the model and the severity score
+        matrix = engine.matrix([index_sets[i] for i in predictable])
+        risks = engine.severity.assess(matrix)
+        for risk in risks:
+            report_risk(risk)
+        if top_k:
+            differentials = engine.differential(matrix, top_k)
+            diseases = [differential[0]['disease'] for differential in differentials]
+        else:
+            differentials = [None] * len(predictable)
+            diseases = engine.bundle.predict(matrix)
+        predictions = dict(zip(predictable, zip(diseases, risks, differentials)))
+
+        results = []
+        for i, indices in enumerate(index_sets):
+            if i not in predictions:
+                results.append({'error': 'Could not predict disease from provided symptoms'})
+                continue
+            disease, risk, differential = predictions[i]
+            disease = str(disease)
+            result = {
+                'predicted_disease': disease,
+                'matched_symptoms': [str(engine.columns[index]) for index in indices],
+                'risk': risk,
+                **engine.knowledge.details(disease)
+            }
+            if differential is not None:
+                result['differential'] = differential
+            results.append(result)
+
+        return jsonify({'model_version': engine.version, 'results': results})
+
+    except Exception as e:
+        logger.exception("Error in batch prediction")
         return jsonify({
             'error': str(e)
         }), 500
 
+def cacheable(payload):
+    """
+    JSON response that clients may cache and revalidate with If-None-Match.
+    """
+    response = jsonify(payload)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config.get('SYMPTOM_CACHE_SECONDS', 3600)
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/symptoms', methods=['GET'])
+def symptom_vocabulary():
+    """
+    Every symptom the model knows, for clients that autocomplete locally.
+    """
+    suggester = get_engine().suggester
+    return cacheable({'version': suggester.etag, 'symptoms': suggester.vocabulary()})
+
+@app.route('/symptoms/suggest', methods=['GET'])
+def suggest_symptoms():
+    """
+    Symptoms whose name, or a word in it, starts with ?q= (underscores
+    and spaces are interchangeable). ?limit= caps the number returned.
+    """
+    try:
+        limit = int(request.args.get('limit', app.config.get('SYMPTOM_SUGGEST_LIMIT', 10)))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    limit = max(1, min(limit, app.config.get('SYMPTOM_SUGGEST_MAX', 50)))
+
+    query = request.args.get('q', '')
+    return cacheable({
+        'query': query,
+        'suggestions': get_engine().suggester.suggest(query, limit)
+    })
+
+def symptom_list(value):
+    if isinstance(value, str):
+        return [s for s in value.split(',') if s.strip()]
+    if isinstance(value, list):
+        return [str(s) for s in value if str(s).strip()]
+    return []
+
+@app.route('/symptoms/next', methods=['POST'])
+def next_symptom():
+    """
+    Interactive triage step. Takes the symptoms confirmed so far and the
+    ones ruled out, {"present": [...], "absent": [...]}, and returns the
+    questions that best narrow down the disease, most informative first,
+    with the current candidate diseases. Repeat with each answer added
+    until "done" is true.
+    """
+    if not request.is_json:
+        return jsonify({
+            'error': 'Content-Type must be application/json'
+        }), 415
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    engine = get_engine()
+    present = engine.encode(symptom_list(data.get('present')))
+    absent = [index for index in engine.encode(symptom_list(data.get('absent'))) if index not in present]
+
+    result = engine.questioner.next_questions(
+        present, absent,
+        limit=app.config.get('TRIAGE_QUESTION_LIMIT', 3),
+        candidates=app.config.get('TRIAGE_CANDIDATE_LIMIT', 5)
+    )
+    return jsonify({
+        'present': [str(engine.columns[index]) for index in present],
+        'absent': [str(engine.columns[index]) for index in absent],
+        'done': not result['questions'],
+        **result
+    })
+
+@app.route('/model', methods=['GET'])
+def model_info():
+    engine = get_engine()
+    return jsonify({
+        'version': engine.version,
+        'generation': engine.generation,
+        'available': list_versions(ARTIFACT_DIR)
+    })
+
+@app.route('/model/reload', methods=['POST'])
+@admin_only
+def model_reload():
+    """
+    Load and switch to a model bundle without restarting. Send
+    {"version": "..."} to activate a specific bundle, or no body to
+    reload whatever artifacts/CURRENT names. Requires the X-Admin-Token
+    header to match MODEL_ADMIN_TOKEN.
+    """
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    if version is not None and version not in list_versions(ARTIFACT_DIR):
+        return jsonify({'error': f'Unknown model version {version}'}), 404
+
+    try:
+        engine = reload_engine(version, artifact_dir=ARTIFACT_DIR)
+    except BundleError as e:
+        logger.exception("Model reload failed")
+        return jsonify({'error': str(e)}), 422
+
+    return jsonify({'version': engine.version, 'generation': engine.generation})
+
 if __name__ == '__main__':
+    # Pick up models published to artifacts/CURRENT without a restart
+    if app.config.get('MODEL_WATCH_SECONDS'):
+        start_watcher(app.config['MODEL_WATCH_SECONDS'])
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+ASGI entry point:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+The event loop owns the sockets, so a client on a slow link only holds a
+connection, not a worker. BufferedBody reads the whole request body on
+the loop before the request is handed to a pool thread, and the response
+is queued in full (ASGI_SEND_QUEUE_SIZE=0) and written back from the
+loop, so a handler never waits on the client in either direction.
+Handlers run in a bounded thread pool of ASGI_THREADS and keep using the
+pooled, blocking pymongo client, which releases the GIL while it waits
+on MongoDB. Keep MONGODB_MAX_POOL_SIZE at or above ASGI_THREADS.
+
+Long-lived streams (the /events/stream feed) hold a pool thread for as
+long as the client stays connected; size the pool for them.
+"""
+from a2wsgi import WSGIMiddleware
+
+from app import app
+from config import Config
+from inference import start_watcher
+
+
+class BufferedBody:
+    """
+    ASGI middleware that receives the full request body before calling
+    app, then replays it as a single message. Bodies over max_size are
+    refused with 413 without reaching app.
+    """
+
+    def __init__(self, app, max_size):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_size:
+                await send({'type': 'http.response.start', 'status': 413,
+                            'headers': [(b'content-type', b'text/plain')]})
+                await send({'type': 'http.response.body', 'body': b'Request body too large'})
+                return
+            chunks.append(chunk)
+            more_body = message.get('more_body', False)
+
+        buffered = {'type': 'http.request', 'body': b''.join(chunks), 'more_body': False}
+
+        async def replay():
+            nonlocal buffered
+            if buffered is not None:
+                message, buffered = buffered, None
+                return message
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+
+application = BufferedBody(
+    WSGIMiddleware(
+        app,
+        workers=Config.ASGI_THREADS,
+        send_queue_size=Config.ASGI_SEND_QUEUE_SIZE
+    ),
+    max_size=Config.ASGI_MAX_BODY_SIZE
+)
+
+# Pick up models published to artifacts/CURRENT without a restart
+if Config.MODEL_WATCH_SECONDS:
+    start_watcher(Config.MODEL_WATCH_SECONDS)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(application, host=Config.ASGI_HOST, port=Config.ASGI_PORT)
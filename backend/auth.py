@@ -1,18 +1,36 @@
 from flask import jsonify
 import jwt
 from functools import wraps
-from pymongo import MongoClient
 from datetime import datetime, timedelta
 from flask import request
 
-# MongoDB setup
-client = MongoClient('mongodb://localhost:27017/')
-db = client.healthcare_db
+from cache import TTLCache
+from config import Config
+
+# MongoDB setup (shared, pooled client)
+from config.database import db
 
 # JWT Configuration
 SECRET_KEY = 'your-secret-key'  # Change this to a secure secret key in production
 TOKEN_EXPIRATION = 24  # hours
 
+# Recently verified users keyed by token subject, so polled endpoints
+# don't hit MongoDB on every request. Entries expire after a short TTL
+# and are dropped explicitly on profile change or signout.
+user_cache = TTLCache(maxsize=Config.AUTH_USER_CACHE_SIZE, ttl=Config.AUTH_USER_CACHE_TTL)
+
+def load_user(user_id):
+    user = user_cache.get(user_id)
+    if user is None:
+        user = db.users.find_one({'_id': user_id})
+        if user:
+            user_cache.put(user_id, user)
+    return dict(user) if user else None
+
+def invalidate_user(user_id):
+    if user_id is not None:
+        user_cache.pop(user_id)
+
 def create_token(user_id):
     try:
         payload = {
@@ -24,19 +42,36 @@ def create_token(user_id):
     except Exception as e:
         return str(e)
 
+def get_request_token():
+    if 'Authorization' in request.headers:
+        parts = request.headers['Authorization'].split(' ')
+        if len(parts) > 1:
+            return parts[1]
+    return None
+
+def token_subject():
+    """
+    Subject of a valid bearer token on the current request, or None.
+    """
+    token = get_request_token()
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])['sub']
+    except jwt.InvalidTokenError:
+        return None
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(' ')[1]
+        token = get_request_token()
         
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
             
         try:
             data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            current_user = db.users.find_one({'_id': data['sub']})
+            current_user = load_user(data['sub'])
             if not current_user:
                 return jsonify({'error': 'Invalid token'}), 401
         except:
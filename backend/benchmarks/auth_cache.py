@@ -0,0 +1,116 @@
+"""
+Compare authenticated request latency with and without the token
+verification user cache in auth.py.
+
+    python benchmarks/auth_cache.py                    # mongomock + simulated latency
+    python benchmarks/auth_cache.py --uri mongodb://localhost:27017/bench_db
+
+Run from the backend directory.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _SlowCollection:
+    # Adds a fixed delay to find_one to stand in for a network round trip
+    def __init__(self, collection, latency):
+        self._collection = collection
+        self._latency = latency
+
+    def find_one(self, *args, **kwargs):
+        time.sleep(self._latency)
+        return self._collection.find_one(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class _SlowDatabase:
+    def __init__(self, database, latency):
+        self._database = database
+        self._latency = latency
+
+    def __getattr__(self, name):
+        return _SlowCollection(getattr(self._database, name), self._latency)
+
+    def __getitem__(self, name):
+        return _SlowCollection(self._database[name], self._latency)
+
+
+class _SlowClient:
+    def __init__(self, client, latency):
+        self._client = client
+        self._latency = latency
+
+    def get_default_database(self, default=None):
+        return _SlowDatabase(self._client.get_default_database(default=default), self._latency)
+
+    def close(self):
+        self._client.close()
+
+
+def run(client, path, headers, requests):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<14} mean {statistics.mean(timings):7.3f} ms   "
+          f"p50 {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--uri', help='MongoDB URI to benchmark against (default: mongomock)')
+    parser.add_argument('--latency-ms', type=float, default=1.0,
+                        help='Simulated round-trip time for mongomock lookups')
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    from config.database import set_client
+    if args.uri:
+        from pymongo import MongoClient
+        set_client(MongoClient(args.uri))
+    else:
+        import mongomock
+        set_client(_SlowClient(mongomock.MongoClient(), args.latency_ms / 1000))
+
+    import auth
+    from __init__ import create_app
+
+    app = create_app()
+    client = app.test_client()
+
+    user_id = uuid.uuid4().hex
+    auth.db.users.insert_one({'_id': user_id, 'name': 'Bench', 'email': f'{user_id}@bench.local'})
+    headers = {'Authorization': f'Bearer {auth.create_token(user_id)}'}
+    path = '/user/api/auth/verify-token'
+
+    try:
+        maxsize = auth.user_cache.maxsize
+        auth.user_cache.maxsize = 0
+        auth.user_cache.clear()
+        report('without cache', run(client, path, headers, args.requests))
+
+        auth.user_cache.maxsize = maxsize
+        report('with cache', run(client, path, headers, args.requests))
+        print(f"cache stats: {auth.user_cache.stats()}")
+    finally:
+        auth.db.users.delete_one({'_id': user_id})
+
+
+if __name__ == '__main__':
+    main()
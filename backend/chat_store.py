@@ -0,0 +1,199 @@
+import atexit
+import threading
+from collections import deque
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from config.logger import get_logger
+from models.chat import ChatSession
+
+logger = get_logger('chat_store')
+
+# Appointment booking questions in the order they are asked. The step
+# name is also the appointment_data key the answer is stored under.
+BOOKING_STEPS = [
+    ('name', 'Please enter your name:'),
+    ('age', 'Please enter your age:'),
+    ('email', 'Please enter your email address:'),
+    ('contact', 'Please enter your contact number:'),
+    ('address', 'Please enter your address:'),
+    ('time', 'Please enter your preferred appointment time (YYYY-MM-DD HH:MM):'),
+    ('complete', 'Thank you! Your appointment has been scheduled. We will send a confirmation email shortly.'),
+]
+PROMPTS = dict(BOOKING_STEPS)
+TRANSITIONS = {step: next_step for (step, _), (next_step, _) in zip(BOOKING_STEPS, BOOKING_STEPS[1:])}
+FIRST_BOOKING_STEP = BOOKING_STEPS[0][0]
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindWriter:
+    """
+    Buffers chat messages and inserts them in the background, so a message
+    exchange costs no synchronous MongoDB round trip for its messages. Each
+    flush is one unordered insert_many. Messages get their _id when queued,
+    so after a partial failure the retry skips the ones already written
+    (duplicate key) instead of failing on them forever. A message that
+    still fails after max_retries flushes is dead-lettered: logged in full
+    and kept in dead_letters, so one bad message cannot hold the queue.
+    Pending messages are flushed at interpreter exit.
+    """
+
+    def __init__(self, database_getter, flush_interval=0.2, max_batch=500, max_retries=10,
+                 dead_letter_size=1000):
+        self._database_getter = database_getter
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.dead_letters = deque(maxlen=dead_letter_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._messages = []
+        self._attempts = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_messages(self, *messages):
+        for message in messages:
+            message.setdefault('_id', ObjectId())
+        with self._lock:
+            self._messages.extend(messages)
+            pending = len(self._messages)
+        self._ensure_started()
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._messages)
+
+    def flush(self):
+        """
+        Write everything buffered so far. Safe to call from any thread.
+        """
+        with self._flush_lock:
+            with self._lock:
+                messages, self._messages = self._messages, []
+            if not messages:
+                return
+            try:
+                self._database_getter().chat_messages.insert_many(messages, ordered=False)
+                self._forget(messages)
+                return
+            except BulkWriteError as e:
+                # Duplicate keys were written by an earlier attempt
+                retry = [messages[error['index']] for error in e.details.get('writeErrors', [])
+                         if error.get('code') != DUPLICATE_KEY]
+                if retry:
+                    logger.error("Chat flush failed for %d messages; retrying: %s",
+                                 len(retry), e.details.get('writeErrors'))
+            except PyMongoError:
+                logger.exception("Chat flush failed; retrying %d messages", len(messages))
+                retry = messages
+            failed = {id(message) for message in retry}
+            self._forget([message for message in messages if id(message) not in failed])
+            retry = self._count_attempt(retry)
+            with self._lock:
+                self._messages[:0] = retry
+
+    def _forget(self, messages):
+        for message in messages:
+            self._attempts.pop(message['_id'], None)
+
+    def _count_attempt(self, messages):
+        """
+        Record a failed attempt for each of messages and return those
+        still worth retrying; the rest go to dead_letters.
+        """
+        retry, dropped = [], []
+        for message in messages:
+            attempts = self._attempts.get(message['_id'], 0) + 1
+            if attempts >= self.max_retries:
+                self._attempts.pop(message['_id'], None)
+                dropped.append(message)
+            else:
+                self._attempts[message['_id']] = attempts
+                retry.append(message)
+        if dropped:
+            logger.error("Dropping %d chat messages after %d failed flushes: %s",
+                         len(dropped), self.max_retries, dropped)
+            self.dead_letters.extend(dropped)
+        return retry
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopped.clear()
+                    self._thread = threading.Thread(target=self._run, name='chat-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Chat writer flush raised")
+
+    def close(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+class ChatSessionStore:
+    """
+    Chat sessions in MongoDB. A session is read fresh for every request,
+    since any worker process may serve the user's next message, and
+    written back synchronously with a version check: a save made from a
+    copy that another request has since changed is refused rather than
+    overwriting the newer state.
+    """
+
+    def __init__(self, database_getter, writer):
+        self._database_getter = database_getter
+        self.writer = writer
+
+    def get_active(self, user_id):
+        data = self._database_getter().chat_sessions.find_one({'user_id': user_id, 'status': 'active'})
+        return ChatSession.from_dict(data) if data else None
+
+    def save(self, session):
+        """
+        Write session if it is unchanged since it was read. Returns False
+        when another request saved it first.
+        """
+        expected = session.version
+        document = session.to_dict()
+        document['version'] = expected + 1
+        # Sessions written before versioning have no version field
+        version_filter = expected if expected else {'$in': [None, 0]}
+        result = self._database_getter().chat_sessions.replace_one(
+            {'_id': session._id, 'version': version_filter}, document
+        )
+        if not result.matched_count:
+            return False
+        session.version = expected + 1
+        return True
+
+    def start(self, session):
+        chat_sessions = self._database_getter().chat_sessions
+        # Close whatever session the user had open before
+        chat_sessions.update_many(
+            {'user_id': session.user_id, 'status': 'active'},
+            {'$set': {'status': 'completed'}, '$inc': {'version': 1}}
+        )
+        chat_sessions.insert_one(dict(session.to_dict(), _id=session._id))
+
+
+def create_chat_store(database_getter, flush_interval=0.2, max_batch=500, max_retries=10):
+    writer = WriteBehindWriter(database_getter, flush_interval=flush_interval, max_batch=max_batch,
+                               max_retries=max_retries)
+    atexit.register(writer.close)
+    return ChatSessionStore(database_getter, writer)
@@ -4,6 +4,81 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
-    MONGODB_URI = os.environ.get('MONGODB_URI') or 'mongodb://localhost:27017/healthcare_db'
+    MONGODB_URI = os.environ.get('MONGODB_URI') or os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/healthcare_db'
+    # Used when MONGODB_URI does not name a database
+    MONGODB_DB = os.environ.get('MONGODB_DB') or 'healthcare_db'
+    # Create indexes in create_app; off by default, since it blocks on MongoDB.
+    # Run python -m config.indexes --ensure at deploy time instead
+    MONGODB_ENSURE_INDEXES = (os.environ.get('MONGODB_ENSURE_INDEXES') or 'false').lower() == 'true'
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE') or 50)
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE') or 0)
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS') or 5000)
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS') or 5000)
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS') or 30000)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
-    DEBUG = True 
\ No newline at end of file
+    # The routes use {'email', 'role'} dicts as token identities
+    JWT_VERIFY_SUB = False
+    DEBUG = True
+    AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE') or 10000)
+    AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL') or 30)  # seconds
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT') or 50)
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX') or 200)
+    CHAT_FLUSH_INTERVAL_MS = int(os.environ.get('CHAT_FLUSH_INTERVAL_MS') or 200)
+    CHAT_FLUSH_BATCH = int(os.environ.get('CHAT_FLUSH_BATCH') or 500)
+    # Failed flushes a chat message survives before it is logged and dropped
+    CHAT_FLUSH_MAX_RETRIES = int(os.environ.get('CHAT_FLUSH_MAX_RETRIES') or 10)
+    # 'mongo' shares change events between worker processes; the default
+    # in-memory bus only reaches clients connected to the same process
+    EVENTS_RELAY = os.environ.get('EVENTS_RELAY') or 'memory'
+    EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS') or 15)
+    # Each open /events/stream holds a server thread (one of WEB_THREADS per
+    # gunicorn worker), so cap them per process; streams end after
+    # EVENTS_STREAM_SECONDS and the client reconnects
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS') or 2)
+    EVENTS_STREAM_SECONDS = int(os.environ.get('EVENTS_STREAM_SECONDS') or 300)
+    TRIAGE_REFRESH_SECONDS = int(os.environ.get('TRIAGE_REFRESH_SECONDS') or 30)
+    # Set APPOINTMENT_STATS_CACHE_TTL=0 to disable the per-doctor stats cache
+    APPOINTMENT_STATS_CACHE_SIZE = int(os.environ.get('APPOINTMENT_STATS_CACHE_SIZE') or 1024)
+    APPOINTMENT_STATS_CACHE_TTL = int(os.environ.get('APPOINTMENT_STATS_CACHE_TTL') or 15)  # seconds
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE') or 1.0)
+    PREDICT_BATCH_LIMIT = int(os.environ.get('PREDICT_BATCH_LIMIT') or 1000)
+    # Largest differential (top_k) a prediction request may ask for
+    PREDICT_TOP_K_MAX = int(os.environ.get('PREDICT_TOP_K_MAX') or 10)
+    PREDICT_CACHE_SIZE = int(os.environ.get('PREDICT_CACHE_SIZE') or 1024)
+    PREDICT_CACHE_TTL = int(os.environ.get('PREDICT_CACHE_TTL') or 300)  # seconds 
+    # Async serving mode (asgi.py); handlers run in a pool of ASGI_THREADS
+    ASGI_HOST = os.environ.get('ASGI_HOST') or '0.0.0.0'
+    ASGI_PORT = int(os.environ.get('ASGI_PORT') or 5000)
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS') or 32)
+    # Response chunks buffered per connection before the handler waits;
+    # 0 buffers the whole response
+    ASGI_SEND_QUEUE_SIZE = int(os.environ.get('ASGI_SEND_QUEUE_SIZE') or 0)
+    # Largest request body read into memory before a handler runs
+    ASGI_MAX_BODY_SIZE = int(os.environ.get('ASGI_MAX_BODY_SIZE') or 10 * 1024 * 1024)
+    # Production launcher (gunicorn.conf.py); WEB_WORKERS=0 means one per core
+    WEB_BIND = os.environ.get('WEB_BIND') or '0.0.0.0:5000'
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS') or 0)
+    WEB_THREADS = int(os.environ.get('WEB_THREADS') or 4)
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT') or 30)  # seconds
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT') or 30)  # seconds
+    WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE') or 5)  # seconds
+    # Recycle workers after this many requests (0 = never)
+    WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS') or 0)
+    # Seconds between checks of artifacts/CURRENT for a new model (0 = off).
+    # Started by the serving entry points only, one watcher per worker
+    MODEL_WATCH_SECONDS = int(os.environ.get('MODEL_WATCH_SECONDS') or 0)
+    # Shared secret for POST /model/reload (X-Admin-Token); empty disables it
+    MODEL_ADMIN_TOKEN = os.environ.get('MODEL_ADMIN_TOKEN') or ''
+    # Severity thresholds (Symptom-severity.csv weights) for the risk returned with predictions
+    RISK_HIGH_SCORE = int(os.environ.get('RISK_HIGH_SCORE') or 13)
+    RISK_MEDIUM_SCORE = int(os.environ.get('RISK_MEDIUM_SCORE') or 7)
+    # Any single symptom weighted this high makes a case high risk
+    RISK_CRITICAL_WEIGHT = int(os.environ.get('RISK_CRITICAL_WEIGHT') or 7)
+    # Symptom autocomplete (/symptoms/suggest)
+    SYMPTOM_SUGGEST_LIMIT = int(os.environ.get('SYMPTOM_SUGGEST_LIMIT') or 10)
+    SYMPTOM_SUGGEST_MAX = int(os.environ.get('SYMPTOM_SUGGEST_MAX') or 50)
+    SYMPTOM_CACHE_SECONDS = int(os.environ.get('SYMPTOM_CACHE_SECONDS') or 3600)
+    # Interactive triage (/symptoms/next): questions and candidate diseases returned per step
+    TRIAGE_QUESTION_LIMIT = int(os.environ.get('TRIAGE_QUESTION_LIMIT') or 3)
+    TRIAGE_CANDIDATE_LIMIT = int(os.environ.get('TRIAGE_CANDIDATE_LIMIT') or 5)
@@ -1,15 +1,93 @@
 from pymongo import MongoClient
 import os
+import threading
+
+from config import Config
+from config.logger import get_logger
+
+logger = get_logger('database')
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _create_client(config=Config):
+    return MongoClient(
+        config.MONGODB_URI,
+        maxPoolSize=config.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=config.MONGODB_MIN_POOL_SIZE,
+        connectTimeoutMS=config.MONGODB_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=config.MONGODB_SOCKET_TIMEOUT_MS,
+    )
+
+
+def get_client():
+    """
+    Return the process-wide MongoClient, creating it on first use. The
+    client owns a connection pool and is safe to share between threads.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+                logger.info("MongoDB client created (pool size %d)", Config.MONGODB_MAX_POOL_SIZE)
+    return _client
+
+
+def set_client(client):
+    """
+    Replace the shared client, e.g. with mongomock.MongoClient() in tests.
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def _reset_after_fork():
+    """
+    A forked worker must not use the parent's client, whose sockets and
+    monitor threads belong to the parent; forget it so the worker creates
+    its own on first use.
+    """
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 def get_database():
-    MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/smart_healthcare')
-    try:
-        client = MongoClient(MONGO_URI)
-        db = client.get_database()
-        print("Connected to MongoDB successfully!")
-        return db
-    except Exception as e:
-        print("Failed to connect to MongoDB:", str(e))
-        raise e
-
-mongo = get_database() 
\ No newline at end of file
+    return get_client().get_default_database(default=Config.MONGODB_DB)
+
+
+class _DatabaseProxy:
+    """
+    Stands in for a pymongo Database so modules can hold a reference at
+    import time while the client itself is only created on first query.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_database(), name)
+
+    def __getitem__(self, name):
+        return get_database()[name]
+
+
+class _Mongo:
+    db = _DatabaseProxy()
+
+
+db = _Mongo.db
+mongo = _Mongo()
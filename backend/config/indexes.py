@@ -0,0 +1,157 @@
+"""
+MongoDB index declarations and bootstrap.
+
+Every query shape used by the routes should be covered by an index
+declared here. ensure_indexes() is idempotent; run it at deploy time with
+the CLI (or at app creation with MONGODB_ENSURE_INDEXES=true). The CLI
+also reports query shapes that still fall back to a collection scan:
+
+    python -m config.indexes --ensure --report
+"""
+import argparse
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+from config.logger import get_logger
+
+logger = get_logger('indexes')
+
+INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+    ],
+    'appointments': [
+        IndexModel([('doctor_id', ASCENDING), ('status', ASCENDING), ('appointment_time', ASCENDING),
+                    ('_id', ASCENDING)], name='doctor_status_time'),
+        IndexModel([('doctor_id', ASCENDING), ('appointment_time', ASCENDING), ('_id', ASCENDING)],
+                   name='doctor_time'),
+        IndexModel([('patient_id', ASCENDING), ('appointment_time', ASCENDING), ('_id', ASCENDING)],
+                   name='patient_time'),
+    ],
+    'chat_messages': [
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_timestamp'),
+        IndexModel([('session_id', ASCENDING), ('timestamp', ASCENDING), ('_id', ASCENDING)],
+                   name='session_timestamp'),
+    ],
+    'chat_sessions': [
+        IndexModel([('user_id', ASCENDING), ('status', ASCENDING)], name='user_status'),
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='user_created'),
+    ],
+    'emergencies': [
+        IndexModel([('patient_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='patient_created'),
+        IndexModel([('priority_level', DESCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='priority_created'),
+        IndexModel([('status', ASCENDING), ('priority_level', DESCENDING), ('created_at', ASCENDING),
+                    ('_id', ASCENDING)], name='triage_queue'),
+    ],
+}
+
+# Representative (filter, sort) pairs for each query the routes issue.
+# Values are placeholders; only the shape matters to the planner.
+QUERY_SHAPES = [
+    ('users', {'email': 'x'}, None),
+    ('appointments', {'doctor_id': 'x'}, [('appointment_time', ASCENDING), ('_id', ASCENDING)]),
+    ('appointments', {'doctor_id': 'x', 'status': 'pending'}, [('appointment_time', ASCENDING), ('_id', ASCENDING)]),
+    ('appointments', {'doctor_id': 'x', 'appointment_time': {'$gte': 0}},
+     [('appointment_time', ASCENDING), ('_id', ASCENDING)]),
+    ('appointments', {'patient_id': 'x'}, [('appointment_time', ASCENDING), ('_id', ASCENDING)]),
+    ('chat_messages', {'user_id': 'x'}, [('timestamp', DESCENDING)]),
+    ('chat_messages', {'session_id': 'x', 'user_id': 'x'}, [('timestamp', ASCENDING), ('_id', ASCENDING)]),
+    ('chat_sessions', {'user_id': 'x', 'status': 'active'}, None),
+    ('chat_sessions', {'user_id': 'x'}, [('created_at', DESCENDING), ('_id', DESCENDING)]),
+    ('emergencies', {'patient_id': 'x'}, [('created_at', DESCENDING), ('_id', DESCENDING)]),
+    ('emergencies', {}, [('priority_level', DESCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+    ('emergencies', {'status': 'pending'}, [('priority_level', DESCENDING), ('created_at', ASCENDING), ('_id', ASCENDING)]),
+]
+
+
+def ensure_indexes(db):
+    """
+    Create every declared index that is missing. Existing indexes are left
+    alone, so this is safe to run on every start.
+    """
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = db[collection].create_indexes(indexes)
+        except ConnectionFailure as e:
+            logger.warning("Skipping index bootstrap, MongoDB unavailable: %s", e)
+            break
+        except PyMongoError as e:
+            logger.error("Could not create indexes on %s: %s", collection, e)
+    return created
+
+
+def _plan_stages(plan):
+    stages = []
+    while plan:
+        stages.append(plan.get('stage'))
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+    return stages
+
+
+def missing_index_report(db):
+    """
+    Explain each query shape and return the ones whose winning plan is a
+    collection scan or an in-memory sort.
+    """
+    report = []
+    for collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        stages = _plan_stages(plan)
+        if 'COLLSCAN' in stages or 'SORT' in stages:
+            report.append({'collection': collection, 'query': query, 'sort': sort, 'stages': stages})
+    return report
+
+
+def slow_query_report(db, slow_ms=100, limit=50):
+    """
+    Slow operations recorded by the database profiler that did not use an
+    index. Requires profiling to be enabled (db.setProfilingLevel).
+    """
+    return list(db.system.profile.find(
+        {'millis': {'$gte': slow_ms}, 'planSummary': {'$regex': '^COLLSCAN'}},
+        {'ns': 1, 'op': 1, 'command': 1, 'millis': 1, 'planSummary': 1, 'ts': 1}
+    ).sort('ts', DESCENDING).limit(limit))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage MongoDB indexes')
+    parser.add_argument('--ensure', action='store_true', help='create missing indexes')
+    parser.add_argument('--report', action='store_true', help='list query shapes without a usable index')
+    parser.add_argument('--backfill', action='store_true', help='fill in fields added after documents were stored')
+    parser.add_argument('--slow-ms', type=int, help='also list profiled collection scans slower than this')
+    args = parser.parse_args(argv)
+
+    from config.database import get_database
+    db = get_database()
+
+    if args.ensure:
+        for collection, names in ensure_indexes(db).items():
+            print(f"{collection}: {', '.join(names)}")
+
+    if args.backfill:
+        from triage import backfill_priority_levels
+        print(f"emergencies: set priority_level on {backfill_priority_levels(db.emergencies)} documents")
+
+    if args.report or not (args.ensure or args.backfill or args.slow_ms is not None):
+        missing = missing_index_report(db)
+        for shape in missing:
+            print(f"MISSING INDEX {shape['collection']} query={shape['query']} "
+                  f"sort={shape['sort']} plan={' <- '.join(shape['stages'])}")
+        if not missing:
+            print("All known query shapes are covered by an index")
+
+    if args.slow_ms is not None:
+        for op in slow_query_report(db, args.slow_ms):
+            print(f"SLOW {op.get('ns')} {op.get('op')} {op.get('millis')}ms {op.get('planSummary')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+
+
+class DebugSampler(logging.Filter):
+    """
+    Lets through only a fraction of DEBUG records so debug logging can be
+    left on under load. Records at INFO and above always pass.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records as they are. The stock handler
+    formats the message and traceback on the calling thread so records
+    can cross process boundaries; the queue here is in-process, so that
+    work is left to the listener. Arguments are rendered when the record
+    is written, so log values rather than objects that change afterwards.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level='INFO', debug_sample_rate=1.0, stream=None):
+    """
+    Route application logs through a queue so request threads only pay
+    for the level check, filters and an enqueue; a background listener
+    does the formatting and I/O.
+    Safe to call more than once.
+    """
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(debug_sample_rate))
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def _restart_after_fork():
+    # The listener thread does not survive fork; start a new one in the child
+    if _listener is not None:
+        _listener._thread = None
+        _listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name):
+    return logging.getLogger(name)
@@ -0,0 +1,221 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from config.logger import get_logger
+
+logger = get_logger('events')
+
+
+class Subscription:
+    """
+    A subscriber's bounded inbox. If the consumer falls behind, new events
+    are dropped and `overflowed` is set so the client can be told to
+    refetch instead of silently missing updates.
+    """
+
+    def __init__(self, bus, topics, accept=None, maxsize=100):
+        self._bus = bus
+        self.topics = tuple(topics)
+        self.accept = accept
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def wants(self, topic, data):
+        if not any(topic == t or topic.startswith(t + '.') for t in self.topics):
+            return False
+        return self.accept is None or self.accept(topic, data)
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Next (topic, data) event, or None if nothing arrived within timeout.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for change notifications. Topics are
+    dotted names ('emergency.created'); subscribing to 'emergency' matches
+    every emergency event. Publishing never blocks the caller.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.relay = None
+
+    def subscribe(self, topics, accept=None, maxsize=100):
+        subscription = Subscription(self, topics, accept, maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, topic, data):
+        if self.relay is not None:
+            self.relay.forward(topic, data)
+        return self.publish_local(topic, data)
+
+    def publish_local(self, topic, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        delivered = 0
+        for subscription in subscriptions:
+            if subscription.wants(topic, data):
+                subscription.deliver((topic, data))
+                delivered += 1
+        logger.debug("Published %s to %d subscribers", topic, delivered)
+        return delivered
+
+    def __len__(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+
+class MongoEventRelay:
+    """
+    Fans events out to the buses of other worker processes through a
+    MongoDB collection. Each event gets a sequence number from a counter
+    document, and every process polls for sequence numbers it has not
+    seen yet, skipping the ones it published itself.
+    """
+
+    def __init__(self, bus, database_getter, poll_interval=0.5, retention_seconds=3600, gap_timeout=5):
+        self.bus = bus
+        self._database_getter = database_getter
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.gap_timeout = gap_timeout
+        self.origin = uuid.uuid4().hex
+        self._last_seq = None
+        self._gap_since = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _next_seq(self, db):
+        counter = db.counters.find_one_and_update(
+            {'_id': 'events'}, {'$inc': {'seq': 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return counter['seq']
+
+    def forward(self, topic, data):
+        try:
+            db = self._database_getter()
+            db.events.insert_one({
+                'seq': self._next_seq(db),
+                'topic': topic,
+                'data': data,
+                'origin': self.origin,
+                'created_at': datetime.utcnow()
+            })
+        except PyMongoError:
+            logger.exception("Could not relay %s", topic)
+
+    def poll(self):
+        db = self._database_getter()
+        if self._last_seq is None:
+            latest = db.counters.find_one({'_id': 'events'})
+            self._last_seq = latest['seq'] if latest else 0
+            return 0
+        relayed = 0
+        for event in db.events.find({'seq': {'$gt': self._last_seq}}).sort('seq', ASCENDING):
+            if event['seq'] != self._last_seq + 1:
+                # An earlier sequence number is still being written; wait
+                # for it unless its publisher evidently failed
+                if self._gap_since is None:
+                    self._gap_since = time.monotonic()
+                if time.monotonic() - self._gap_since < self.gap_timeout:
+                    break
+            self._gap_since = None
+            self._last_seq = event['seq']
+            if event['origin'] != self.origin:
+                self.bus.publish_local(event['topic'], event['data'])
+                relayed += 1
+        return relayed
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except PyMongoError:
+                logger.exception("Event relay poll failed")
+
+    def start(self):
+        db = self._database_getter()
+        db.events.create_index([('seq', ASCENDING)], name='seq')
+        db.events.create_index('created_at', name='expire', expireAfterSeconds=self.retention_seconds)
+        self.poll()
+        self.bus.relay = self
+        self._thread = threading.Thread(target=self._run, name='event-relay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.bus.relay = None
+
+    def after_fork(self):
+        """
+        Resume polling in a forked worker. The worker is a separate
+        subscriber, so it needs its own origin and thread.
+        """
+        self.origin = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='event-relay', daemon=True)
+        self._thread.start()
+
+
+bus = EventBus()
+
+
+def publish(topic, data):
+    return bus.publish(topic, data)
+
+
+def _after_fork():
+    bus._lock = threading.Lock()
+    if bus.relay is not None:
+        bus.relay.after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def start_relay(poll_interval=0.5):
+    """
+    Share events between worker processes through MongoDB. Must be called
+    in each worker (after fork), since it starts a polling thread.
+    """
+    if bus.relay is None:
+        from config.database import get_database
+        MongoEventRelay(bus, get_database, poll_interval=poll_interval).start()
+    return bus.relay
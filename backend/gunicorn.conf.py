@@ -0,0 +1,41 @@
+"""
+Production launcher:
+
+    cd backend
+    gunicorn -c gunicorn.conf.py
+
+The app and model are loaded once in the master (preload_app) and workers
+are forked from it. MongoDB clients, the log listener and the event relay
+are recreated in each worker after fork, so nothing that holds sockets or
+threads is shared between processes. Settings come from the WEB_* options
+in Config.
+"""
+import multiprocessing
+import os
+
+# One BLAS/OpenMP thread per worker; parallelism comes from the workers.
+# Must be set before the app (and numpy) is imported.
+for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(name, '1')
+
+from config import Config
+
+wsgi_app = 'wsgi:application'
+preload_app = True
+
+bind = Config.WEB_BIND
+workers = Config.WEB_WORKERS or multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = Config.WEB_THREADS
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+keepalive = Config.WEB_KEEPALIVE
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+
+
+def post_fork(server, worker):
+    # Each worker watches artifacts/CURRENT itself; the master never serves
+    if Config.MODEL_WATCH_SECONDS:
+        from inference import start_watcher
+        start_watcher(Config.MODEL_WATCH_SECONDS)
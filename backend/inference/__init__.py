@@ -0,0 +1,18 @@
+# Shared, process-wide prediction artifacts (model, encoder, datasets)
+
+from .bundle import BundleError, ModelBundle, list_versions, load_bundle
+from .cache import PredictionCache
+from .engine import (ARTIFACT_DIR, InferenceEngine, ModelWatcher, add_reload_listener, get_engine,
+                     reload_engine, start_watcher)
+from .knowledge import DiseaseRecord, KnowledgeIndex
+from .matcher import SymptomMatcher, normalize_symptom
+from .questions import SymptomQuestioner
+from .severity import SeverityScorer
+from .suggest import SymptomSuggester
+
+__all__ = ['InferenceEngine', 'get_engine', 'reload_engine', 'add_reload_listener',
+           'PredictionCache', 'DiseaseRecord', 'KnowledgeIndex',
+           'SymptomMatcher', 'normalize_symptom',
+           'ModelBundle', 'BundleError', 'load_bundle', 'list_versions',
+           'ModelWatcher', 'start_watcher', 'ARTIFACT_DIR', 'SeverityScorer',
+           'SymptomSuggester', 'SymptomQuestioner']
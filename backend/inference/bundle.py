@@ -0,0 +1,286 @@
+"""
+Versioned model artifact bundles.
+
+A bundle is a directory holding the symptom vocabulary, the label list and
+the linear model weights as .npy files, plus a manifest.json with their
+shapes and SHA-256 checksums. Arrays are memory-mapped read-only, so
+loading is a few page-table entries rather than an unpickle, and worker
+processes share the same physical pages. Nothing in a bundle is pickled.
+
+    artifacts/
+        CURRENT                 name of the active version
+        20261018124500/
+            manifest.json
+            columns.npy labels.npy coef.npy intercept.npy
+
+Export the pickled model shipped with the repo:
+
+    cd backend
+    python -m inference.bundle --export
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+BUNDLE_FORMAT = 1
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+ARRAYS = ('columns', 'labels', 'coef', 'intercept')
+
+
+class BundleError(Exception):
+    pass
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """
+    A loaded bundle. Scores a (n, n_symptoms) 0/1 matrix with the stored
+    linear model; the results match the sklearn LogisticRegression it was
+    exported from.
+    """
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.link = manifest['link']
+        self.columns = arrays['columns']
+        self.labels = arrays['labels']
+        self.coef = arrays['coef']
+        self.intercept = arrays['intercept']
+
+    @classmethod
+    def from_sklearn(cls, model, encoder, columns):
+        """
+        An in-memory bundle wrapping a fitted sklearn linear classifier,
+        for when no exported bundle is available.
+        """
+        arrays, link = _sklearn_arrays(model, encoder, columns)
+        manifest = {'format': BUNDLE_FORMAT, 'version': 'unversioned', 'link': link, 'files': {}}
+        return cls(None, manifest, arrays)
+
+    def decision(self, matrix):
+        return np.asarray(matrix) @ self.coef.T + self.intercept
+
+    def predict(self, matrix):
+        """
+        Disease names for each row of matrix.
+        """
+        scores = self.decision(matrix)
+        if scores.shape[1] == 1:
+            return self.labels[(scores[:, 0] > 0).astype(np.intp)]
+        return self.labels[scores.argmax(axis=1)]
+
+    def predict_proba(self, matrix):
+        """
+        Class probabilities for each row, columns in self.labels order.
+        """
+        scores = self.decision(matrix)
+        if scores.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        if self.link == 'softmax':
+            scores = scores - scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def top_k(self, matrix, k):
+        """
+        The k most probable diseases for each row, most likely first, as
+        (labels, probabilities) arrays of shape (n, k). Only the k winners
+        are sorted; the rest are split off with argpartition.
+        """
+        proba = self.predict_proba(matrix)
+        k = max(1, min(k, proba.shape[1]))
+        top = np.argpartition(proba, -k, axis=1)[:, -k:]
+        top_proba = np.take_along_axis(proba, top, axis=1)
+        order = np.argsort(-top_proba, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self.labels[top], np.take_along_axis(top_proba, order, axis=1)
+
+
+def load_bundle(path, verify=True):
+    """
+    Open the bundle in path. With verify, every file is checked against
+    the manifest checksum first and BundleError is raised on a mismatch,
+    so a truncated or corrupt bundle is never served.
+    """
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Cannot read manifest in {path}: {e}")
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')!r} in {path}")
+
+    arrays = {}
+    for name in ARRAYS:
+        entry = manifest['files'].get(name)
+        if entry is None:
+            raise BundleError(f"Bundle {path} has no {name} array")
+        filename = os.path.join(path, entry['file'])
+        if verify and file_checksum(filename) != entry['sha256']:
+            raise BundleError(f"Checksum mismatch for {entry['file']} in {path}")
+        array = np.load(filename, mmap_mode='r', allow_pickle=False)
+        if list(array.shape) != entry['shape']:
+            raise BundleError(f"Unexpected shape {array.shape} for {entry['file']} in {path}")
+        arrays[name] = array
+
+    if arrays['coef'].shape[1] != len(arrays['columns']):
+        raise BundleError(f"Weights do not match the symptom vocabulary in {path}")
+    return ModelBundle(path, manifest, arrays)
+
+
+def write_bundle(root, columns, labels, coef, intercept, link='softmax', version=None, metadata=None):
+    """
+    Write a new bundle under root and return its version. Files are
+    written to a temporary directory that is renamed into place, so a
+    bundle directory is never seen half-written.
+    """
+    version = version or time.strftime('%Y%m%d%H%M%S')
+    target = os.path.join(root, version)
+    if os.path.exists(target):
+        raise BundleError(f"Bundle {version} already exists in {root}")
+    os.makedirs(root, exist_ok=True)
+
+    arrays = {
+        'columns': np.asarray(columns, dtype=str),
+        'labels': np.asarray(labels, dtype=str),
+        'coef': np.ascontiguousarray(coef, dtype=np.float64),
+        'intercept': np.ascontiguousarray(intercept, dtype=np.float64),
+    }
+    staging = tempfile.mkdtemp(prefix=f'.{version}-', dir=root)
+    try:
+        files = {}
+        for name, array in arrays.items():
+            filename = os.path.join(staging, name + '.npy')
+            np.save(filename, array, allow_pickle=False)
+            files[name] = {
+                'file': name + '.npy',
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'sha256': file_checksum(filename),
+            }
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'version': version,
+            'link': link,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'files': files,
+            'metadata': metadata or {},
+        }
+        with open(os.path.join(staging, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.chmod(staging, 0o755)
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version
+
+
+def _sklearn_arrays(model, encoder, columns):
+    link = 'ovr' if getattr(model, 'multi_class', 'auto') == 'ovr' else 'softmax'
+    arrays = {
+        'columns': np.asarray(columns, dtype=str),
+        'labels': np.asarray(encoder.inverse_transform(model.classes_), dtype=str),
+        'coef': np.ascontiguousarray(model.coef_, dtype=np.float64),
+        'intercept': np.ascontiguousarray(model.intercept_, dtype=np.float64),
+    }
+    return arrays, link
+
+
+def export_sklearn(root, model, encoder, columns, version=None, metadata=None):
+    """
+    Write a bundle from a fitted sklearn linear classifier (such as the
+    LogisticRegression in model.pkl) and its LabelEncoder.
+    """
+    arrays, link = _sklearn_arrays(model, encoder, columns)
+    return write_bundle(root, link=link, version=version, metadata=metadata, **arrays)
+
+
+def list_versions(root):
+    """
+    Names of the complete bundles under root, oldest first.
+    """
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names
+                  if not name.startswith('.') and os.path.isfile(os.path.join(root, name, MANIFEST)))
+
+
+def current_version(root):
+    """
+    The version named in root/CURRENT, or None if there is none.
+    """
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def set_current(root, version):
+    """
+    Point root/CURRENT at version, atomically.
+    """
+    if not os.path.isdir(os.path.join(root, version)):
+        raise BundleError(f"No bundle {version} in {root}")
+    fd, staging = tempfile.mkstemp(prefix='.CURRENT-', dir=root)
+    with os.fdopen(fd, 'w') as f:
+        f.write(version + '\n')
+    os.chmod(staging, 0o644)
+    os.replace(staging, os.path.join(root, CURRENT))
+
+
+def main(argv=None):
+    from .engine import ARTIFACT_DIR, BASE_DIR
+
+    parser = argparse.ArgumentParser(description='Manage model artifact bundles.')
+    parser.add_argument('--root', default=ARTIFACT_DIR, help='bundle directory')
+    parser.add_argument('--export', action='store_true',
+                        help='export model.pkl, encoder.pkl and col.pkl as a new bundle and make it current')
+    parser.add_argument('--version', help='version name for --export (default: a timestamp)')
+    parser.add_argument('--verify', action='store_true', help='check the current bundle')
+    args = parser.parse_args(argv)
+
+    if args.export:
+        loaded = {}
+        for name in ('model', 'encoder', 'col'):
+            with open(os.path.join(BASE_DIR, name + '.pkl'), 'rb') as f:
+                loaded[name] = pickle.load(f)
+        version = export_sklearn(args.root, loaded['model'], loaded['encoder'], loaded['col'],
+                                 version=args.version, metadata={'source': 'model.pkl'})
+        set_current(args.root, version)
+        print(f"Exported bundle {version}")
+
+    if args.verify or not args.export:
+        version = current_version(args.root)
+        if version is None:
+            parser.error(f"No current bundle in {args.root}")
+        bundle = load_bundle(os.path.join(args.root, version))
+        print(f"Bundle {version}: {len(bundle.columns)} symptoms, {len(bundle.labels)} diseases, checksums OK")
+
+
+if __name__ == '__main__':
+    main()
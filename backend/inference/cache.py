@@ -0,0 +1,9 @@
+from cache import TTLCache
+
+
+class PredictionCache(TTLCache):
+    """
+    Cache for whole prediction responses. Keys are expected to be
+    canonical (e.g. the sorted tuple of matched symptom indices) so
+    different spellings of the same symptoms share an entry.
+    """
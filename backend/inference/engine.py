@@ -0,0 +1,277 @@
+import os
+import pickle
+import threading
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from config.logger import get_logger
+
+from .bundle import ModelBundle, current_version, load_bundle, set_current
+from .knowledge import KnowledgeIndex
+from .matcher import SymptomMatcher
+from .questions import SymptomQuestioner
+from .severity import SeverityScorer
+from .suggest import SymptomSuggester
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.path.join(BASE_DIR, "artifacts")
+
+logger = get_logger('inference')
+
+
+class InferenceEngine:
+    """
+    Holds everything the prediction route needs that does not change
+    between requests: the trained model, the label encoder, the symptom
+    columns and the enrichment datasets. Loaded once and shared read-only
+    across threads.
+
+    The model comes from the current bundle under artifact_dir (see
+    inference.bundle), or the named version; the pickled model files are
+    only read if no bundle has been exported.
+    """
+
+    def __init__(self, base_dir=BASE_DIR, generation=0, artifact_dir=None, verify=True, version=None):
+        self.base_dir = base_dir
+        self.generation = generation
+        self.data_dir = os.path.join(base_dir, "data sets")
+        self.artifact_dir = artifact_dir or os.path.join(base_dir, "artifacts")
+
+        # Load the model
+        self.bundle = self._load_bundle(verify, version)
+        self.version = self.bundle.version
+        self.columns = self.bundle.columns
+        self.matcher = SymptomMatcher(self.columns)
+        self.suggester = SymptomSuggester.from_frame(self.columns, self._read_csv("symtoms_df.csv"))
+        self.questioner = SymptomQuestioner.from_frame(self.columns, self._read_training())
+
+        # Load dataset files and index them by disease
+        precautions = self._read_csv("precautions_df.csv")
+        if "Unnamed: 0" in precautions.columns:
+            precautions = precautions.drop(columns=["Unnamed: 0"])
+
+        self.knowledge = KnowledgeIndex.from_frames(
+            description=self._read_csv("description.csv"),
+            medication=self._read_csv("medications.csv"),
+            diet=self._read_csv("diets.csv"),
+            precautions=precautions,
+            workout=self._read_csv("workout_df.csv"),
+        )
+        self.severity = SeverityScorer.from_frame(
+            self.columns,
+            self._read_csv("Symptom-severity.csv"),
+            high_score=Config.RISK_HIGH_SCORE,
+            medium_score=Config.RISK_MEDIUM_SCORE,
+            critical_weight=Config.RISK_CRITICAL_WEIGHT,
+        )
+
+    def _load_bundle(self, verify, version=None):
+        version = version or current_version(self.artifact_dir)
+        if version is not None:
+            return load_bundle(os.path.join(self.artifact_dir, version), verify=verify)
+        return ModelBundle.from_sklearn(
+            self._load_pickle("model.pkl"),
+            self._load_pickle("encoder.pkl"),
+            self._load_pickle("col.pkl"),
+        )
+
+    def _load_pickle(self, name):
+        with open(os.path.join(self.base_dir, name), "rb") as f:
+            return pickle.load(f)
+
+    def _read_csv(self, name, **kwargs):
+        return pd.read_csv(os.path.join(self.data_dir, name), **kwargs)
+
+    def _read_training(self):
+        # uint8 symptom flags rather than int64
+        header = self._read_csv("Training.csv", nrows=0).columns
+        return self._read_csv("Training.csv", dtype={
+            name: "category" if name == "prognosis" else np.uint8 for name in header
+        })
+
+    def predict(self, input_vector):
+        """
+        Run the model on a (1, n_symptoms) input vector and return the
+        decoded disease name.
+        """
+        return self.bundle.predict(input_vector)[0]
+
+    def encode(self, symptoms):
+        """
+        Resolve raw symptom strings to a sorted tuple of distinct column
+        indices. Unmatched symptoms are dropped.
+        """
+        indices = set()
+        for symptom in symptoms:
+            index = self.matcher.match(symptom)
+            if index is not None:
+                indices.add(index)
+        return tuple(sorted(indices))
+
+    def predict_many(self, index_sets):
+        """
+        Predict a disease for each set of column indices with a single
+        model call. Returns a list of disease names in the same order.
+        """
+        if not index_sets:
+            return []
+        return list(self.bundle.predict(self.matrix(index_sets)))
+
+    def differential(self, matrix, k):
+        """
+        The k most probable diseases for each row of matrix, from a single
+        probability call, as lists of {"disease", "probability", ...}
+        dicts enriched from the knowledge index.
+        """
+        labels, probabilities = self.bundle.top_k(matrix, k)
+        return [
+            [
+                dict(disease=str(label), probability=round(float(probability), 4),
+                     **self.knowledge.details(label))
+                for label, probability in zip(row_labels, row_probabilities)
+            ]
+            for row_labels, row_probabilities in zip(labels, probabilities)
+        ]
+
+    def matrix(self, index_sets):
+        """
+        The (n, n_symptoms) 0/1 model input for a list of index sets.
+        """
+        matrix = np.zeros((len(index_sets), len(self.columns)))
+        rows = [row for row, indices in enumerate(index_sets) for _ in indices]
+        cols = [index for indices in index_sets for index in indices]
+        matrix[rows, cols] = 1
+        return matrix
+
+
+_engine = None
+_engine_lock = threading.Lock()
+_reload_listeners = []
+
+
+def get_engine():
+    """
+    Return the process-wide InferenceEngine, loading it on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = InferenceEngine()
+    return _engine
+
+
+def _validate(engine):
+    """
+    Smoke-test a freshly loaded engine before it takes traffic.
+    """
+    engine.predict_many([(index,) for index in range(len(engine.columns))])
+    missing = {}
+    for label in engine.bundle.labels:
+        record = engine.knowledge.get(label)
+        for field in fields(record):
+            if getattr(record, field.name) is None:
+                missing.setdefault(field.name, []).append(str(label).strip())
+    for field, labels in missing.items():
+        logger.warning("Model %s predicts %d diseases with no %s: %s",
+                       engine.version, len(labels), field, ', '.join(labels))
+
+
+def reload_engine(version=None, artifact_dir=None):
+    """
+    Load the model bundle and datasets from disk again, check them, and
+    swap the new engine in with a single assignment. Requests already in
+    flight keep the engine they started with, so the old version is only
+    released once the last of them finishes. If loading or checking
+    fails, the current engine stays in place and the error is raised.
+
+    With a version, that bundle is loaded and, once it passes, made
+    current in artifact_dir (by default the one under base_dir) so every
+    other worker's watcher switches to it too. Listeners registered with add_reload_listener
+    (e.g. result caches) are called with the new engine afterwards.
+    """
+    global _engine
+    with _engine_lock:
+        generation = _engine.generation + 1 if _engine is not None else 0
+        engine = InferenceEngine(generation=generation, artifact_dir=artifact_dir, version=version)
+        _validate(engine)
+        if version is not None:
+            set_current(engine.artifact_dir, version)
+        _engine = engine
+    logger.info("Serving model %s (generation %d)", engine.version, engine.generation)
+    for listener in list(_reload_listeners):
+        listener(engine)
+    return engine
+
+
+def add_reload_listener(listener):
+    _reload_listeners.append(listener)
+
+
+class ModelWatcher:
+    """
+    Polls artifact_dir/CURRENT in the background and reloads the engine
+    when it names a version other than the one being served. A version
+    that fails to load is not retried until CURRENT changes again.
+    """
+
+    def __init__(self, interval=10, artifact_dir=ARTIFACT_DIR):
+        self.interval = interval
+        self.artifact_dir = artifact_dir
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        version = current_version(self.artifact_dir)
+        if version is None or version == self._failed or version == get_engine().version:
+            return False
+        try:
+            reload_engine(artifact_dir=self.artifact_dir)
+        except Exception:
+            logger.exception("Could not load model %s; still serving %s", version, get_engine().version)
+            self._failed = version
+            return False
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_watcher = None
+
+
+def start_watcher(interval=10):
+    """
+    Start the process-wide ModelWatcher. Threads do not survive fork, so
+    call this in each serving process (gunicorn starts it in post_fork),
+    not before forking.
+    """
+    global _watcher
+    if _watcher is None:
+        _watcher = ModelWatcher(interval)
+        _watcher.start()
+    return _watcher
+
+
+def _after_fork():
+    global _engine_lock, _watcher
+    _engine_lock = threading.Lock()
+    # The parent's watcher thread is gone; let the child start its own
+    _watcher = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,119 @@
+import ast
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def clean_list_data(data):
+    """
+    Normalise a dataset cell into a list of strings. Handles numpy rows,
+    stringified Python lists (as stored in diets.csv and medications.csv)
+    and plain strings.
+    """
+    if isinstance(data, (list, np.ndarray)):
+        return [str(item).strip() for item in data if item is not None and str(item).lower() != 'nan']
+    elif isinstance(data, str):
+        if data.startswith('[') and data.endswith(']'):
+            try:
+                parsed = ast.literal_eval(data)
+                if isinstance(parsed, list):
+                    return [str(item).strip() for item in parsed if item is not None]
+            except (ValueError, SyntaxError):
+                pass
+        return [data.strip()]
+    return []
+
+
+# Model labels spelled differently from the enrichment datasets
+DISEASE_ALIASES = {
+    'peptic ulcer diseae': 'peptic ulcer disease',
+}
+
+
+def disease_key(name):
+    """
+    Lookup key for a disease name. The model labels and the datasets
+    disagree on case and spacing ('Diabetes ' vs 'Diabetes'), and on the
+    spelling of a few names, listed in DISEASE_ALIASES.
+    """
+    key = ' '.join(str(name).split()).lower()
+    return DISEASE_ALIASES.get(key, key)
+
+
+@dataclass(frozen=True)
+class DiseaseRecord:
+    """
+    Pre-parsed enrichment data for a single disease. A field is None when
+    the corresponding dataset has no row for the disease.
+    """
+    description: Optional[str] = None
+    medications: Optional[Tuple[str, ...]] = None
+    diet: Optional[Tuple[str, ...]] = None
+    precautions: Optional[Tuple[str, ...]] = None
+    workouts: Optional[Tuple[str, ...]] = None
+
+
+class KnowledgeIndex:
+    """
+    Disease name -> DiseaseRecord map built once from the enrichment
+    datasets, so lookups on the request path are a single dict access.
+    Names are compared by disease_key.
+    """
+
+    def __init__(self, records):
+        self._records = {disease_key(disease): record for disease, record in records}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, disease):
+        return disease_key(disease) in self._records
+
+    def get(self, disease):
+        return self._records.get(disease_key(disease), _EMPTY_RECORD)
+
+    def details(self, disease):
+        """
+        Enrichment fields for a disease as returned by the prediction
+        routes, with placeholder text where a dataset has no entry.
+        """
+        record = self.get(disease)
+        return {
+            'description': record.description if record.description is not None else "No description found",
+            'medications': list(record.medications) if record.medications is not None else ["No medication info found"],
+            'diet': list(record.diet) if record.diet is not None else ["No diet info found"],
+            'precautions': list(record.precautions) if record.precautions is not None else ["No specific precautions found for this condition"],
+            'workouts': list(record.workouts) if record.workouts is not None else ["No workout info found"],
+        }
+
+    @classmethod
+    def from_frames(cls, description, medication, diet, precautions, workout=None):
+        fields = {}
+
+        def first_rows(frame):
+            # Keep the first row per disease, matching the old .values[0] lookup
+            rows = {}
+            for row in frame.itertuples(index=False):
+                rows.setdefault(disease_key(row[0]), row[1:])
+            return rows
+
+        for disease, values in first_rows(description).items():
+            fields.setdefault(disease, {})['description'] = str(values[0])
+        for disease, values in first_rows(medication).items():
+            fields.setdefault(disease, {})['medications'] = tuple(clean_list_data(values[0]))
+        for disease, values in first_rows(diet).items():
+            fields.setdefault(disease, {})['diet'] = tuple(clean_list_data(values[0]))
+        for disease, values in first_rows(precautions).items():
+            fields.setdefault(disease, {})['precautions'] = tuple(clean_list_data(np.array(values, dtype=object)))
+        if workout is not None:
+            # Several rows per disease, kept in file order
+            workout = workout.dropna(subset=['workout'])
+            grouped = workout.groupby(workout['disease'].map(disease_key), sort=False)['workout']
+            for disease, workouts in grouped.agg(tuple).items():
+                fields.setdefault(disease, {})['workouts'] = tuple(str(item).strip() for item in workouts)
+
+        return cls((disease, DiseaseRecord(**kwargs)) for disease, kwargs in fields.items())
+
+
+_EMPTY_RECORD = DiseaseRecord()
@@ -0,0 +1,108 @@
+import difflib
+import heapq
+from collections import defaultdict
+
+
+def normalize_symptom(symptom):
+    """
+    Canonical form used for matching: lower case, underscores as spaces,
+    single spaces between words.
+    """
+    return ' '.join(str(symptom).strip().lower().replace('_', ' ').split())
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomMatcher:
+    """
+    Resolves free-text symptoms to column indices of the model input.
+
+    Scoring is the same as difflib.get_close_matches(query, columns, n=1,
+    cutoff=cutoff), which the prediction route used before: the highest
+    SequenceMatcher ratio against the raw column names wins. An exact
+    match is answered from a dict. Otherwise a trigram index picks the
+    max_candidates columns sharing the most trigrams with the query, and
+    only those are scored, most promising first, so the cheap
+    real_quick_ratio/quick_ratio upper bounds rule out most of them. If
+    none reaches cutoff, every column is scored, so input too garbled to
+    share trigrams with its match still resolves as before.
+    """
+
+    def __init__(self, columns, cutoff=0.6, max_candidates=32):
+        self.columns = list(columns)
+        self.cutoff = cutoff
+        self.max_candidates = max_candidates
+
+        self._raw = [str(column) for column in self.columns]
+        self._names = [normalize_symptom(column) for column in self.columns]
+        self._exact = {}
+        self._grams = defaultdict(list)
+        for index, name in enumerate(self._names):
+            self._exact.setdefault(name, index)
+            self._exact.setdefault(name.replace(' ', ''), index)
+            for gram in _trigrams(name):
+                self._grams[gram].append(index)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def match(self, symptom):
+        """
+        Return the column index that best matches symptom, or None when
+        nothing is similar enough.
+        """
+        query = normalize_symptom(symptom)
+        if not query:
+            return None
+
+        index = self._exact.get(query)
+        if index is None:
+            index = self._exact.get(query.replace(' ', ''))
+        if index is not None:
+            return index
+
+        shared = defaultdict(int)
+        for gram in _trigrams(query):
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] += 1
+
+        index = None
+        if shared:
+            # Rerank only the columns sharing the most trigrams
+            candidates = heapq.nlargest(self.max_candidates, shared, key=shared.__getitem__)
+            index = self._best(query, candidates)
+        if index is None:
+            # Heavily garbled input can share no trigram with its best match
+            index = self._best(query, range(len(self._raw)))
+        return index
+
+    def _best(self, query, candidates):
+        """
+        The candidate with the highest SequenceMatcher ratio against query,
+        at least cutoff, or None.
+        """
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        best_index = None
+        best_score = self.cutoff
+        for candidate in candidates:
+            matcher.set_seq1(self._raw[candidate])
+            # Upper bounds first; ties still need scoring for the tie-break
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score < best_score:
+                continue
+            # Like get_close_matches, prefer the larger string on a tie
+            if (best_index is None or score > best_score
+                    or self._raw[candidate] > self._raw[best_index]):
+                best_index = candidate
+                best_score = score
+        return best_index
+
+    def match_name(self, symptom):
+        index = self.match(symptom)
+        return None if index is None else self.columns[index]
@@ -0,0 +1,132 @@
+import numpy as np
+
+# Bytes -> number of set bits, for NumPy versions without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    """
+    Set bits per bitset, summed over the last axis of a uint64 array.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(words.shape[:-1] + (-1,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def _pack(flags):
+    """
+    Pack a (n, n_cases) boolean matrix into (n, n_words) uint64 bitsets.
+    """
+    flags = np.asarray(flags, dtype=bool)
+    words = -(-flags.shape[1] // 64)
+    padded = np.zeros((flags.shape[0], words * 64), dtype=bool)
+    padded[:, :flags.shape[1]] = flags
+    return np.packbits(padded, axis=1, bitorder='little').view(np.uint64)
+
+
+def _entropy(counts):
+    """
+    Entropy in bits of the distributions along the last axis of counts.
+    """
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.where(totals > 0, counts / totals, 0.0)
+        terms = np.where(p > 0, p * np.log2(p), 0.0)
+    return -terms.sum(axis=-1)
+
+
+class SymptomQuestioner:
+    """
+    Picks the symptom to ask about next during interactive triage.
+
+    The training cases are held as bitsets: one per symptom (the cases
+    showing it) and one per disease (the cases diagnosed with it). The
+    cases consistent with the answers so far are the AND of the matching
+    bitsets. The information gain of every unasked symptom then comes
+    from one broadcast AND against the disease bitsets and a popcount.
+    """
+
+    def __init__(self, columns, diseases, symptom_flags, disease_flags):
+        self.columns = list(columns)
+        self.diseases = list(diseases)
+        self.n_cases = symptom_flags.shape[1]
+        self._symptoms = _pack(symptom_flags)
+        self._diseases = _pack(disease_flags)
+        self._all = _pack(np.ones((1, self.n_cases), dtype=bool))[0]
+
+    @classmethod
+    def from_frame(cls, columns, frame, label_column='prognosis'):
+        """
+        Build from Training.csv: one row per case, 0/1 symptom columns
+        named like the model columns, and the diagnosis in label_column.
+        """
+        symptom_flags = np.zeros((len(columns), len(frame)), dtype=bool)
+        for index, column in enumerate(columns):
+            if column in frame.columns:
+                symptom_flags[index] = frame[column].to_numpy() > 0
+        labels = frame[label_column].astype(str).to_numpy()
+        diseases = sorted(set(labels))
+        disease_flags = np.array([labels == disease for disease in diseases])
+        return cls(columns, diseases, symptom_flags, disease_flags)
+
+    def consistent_cases(self, present=(), absent=()):
+        """
+        Bitset of the cases showing every present symptom and none of the
+        absent ones. If no case shows all the present symptoms, cases
+        showing any of them are used instead; the second value says
+        whether the match was exact.
+        """
+        cases = self._all.copy()
+        for index in present:
+            cases &= self._symptoms[index]
+        exact = True
+        if present and not _popcount(cases):
+            cases = np.bitwise_or.reduce(self._symptoms[list(present)], axis=0)
+            exact = False
+        for index in absent:
+            cases &= ~self._symptoms[index]
+        return cases, exact
+
+    def next_questions(self, present=(), absent=(), limit=3, candidates=5):
+        """
+        Rank the symptoms not yet asked about by information gain over
+        the disease distribution of the consistent cases.
+        """
+        cases, exact = self.consistent_cases(present, absent)
+        by_disease = _popcount(self._diseases & cases)
+        total = int(by_disease.sum())
+
+        result = {'exact': exact, 'cases': total, 'candidates': [], 'questions': []}
+        if not total:
+            return result
+
+        order = np.argsort(-by_disease, kind='stable')[:candidates]
+        result['candidates'] = [
+            {'disease': self.diseases[d], 'probability': round(float(by_disease[d]) / total, 4)}
+            for d in order if by_disease[d]
+        ]
+
+        asked = set(present) | set(absent)
+        open_symptoms = np.array([i for i in range(len(self.columns)) if i not in asked], dtype=np.intp)
+        if not len(open_symptoms) or np.count_nonzero(by_disease) < 2:
+            return result
+
+        # (symptoms, diseases) counts of consistent cases that show each symptom
+        with_symptom = self._symptoms[open_symptoms] & cases
+        yes = _popcount(with_symptom[:, None, :] & self._diseases[None, :, :])
+        no = by_disease[None, :] - yes
+        yes_total = yes.sum(axis=1)
+        p_yes = yes_total / total
+        gain = _entropy(by_disease) - (p_yes * _entropy(yes) + (1 - p_yes) * _entropy(no))
+
+        ranked = np.argsort(-gain, kind='stable')[:limit]
+        result['questions'] = [
+            {
+                'symptom': str(self.columns[open_symptoms[i]]),
+                'information_gain': round(float(gain[i]), 4),
+                'probability': round(float(p_yes[i]), 4),
+            }
+            for i in ranked if gain[i] > 1e-9
+        ]
+        return result
@@ -0,0 +1,67 @@
+import re
+
+import numpy as np
+
+from .matcher import normalize_symptom
+
+RISK_LEVELS = ('low', 'medium', 'high')
+
+
+def _weight_key(symptom):
+    # The datasets disagree on spacing ('foul_smell_of urine' vs
+    # 'foul_smell_ofurine') and pandas suffixes repeated headers
+    # ('fluid_overload.1'), so compare names with both removed
+    return normalize_symptom(re.sub(r'\.\d+$', '', str(symptom))).replace(' ', '')
+
+
+class SeverityScorer:
+    """
+    Severity weights from Symptom-severity.csv, held as a vector aligned
+    with the model's symptom columns, so scoring a batch of input vectors
+    is one matrix-vector product.
+
+    A case is high risk when its summed weight reaches high_score or it
+    includes any symptom weighted critical_weight or more; medium from
+    medium_score. The levels are the emergency priorities, and
+    priority_level is the number the triage queue orders them by, so a
+    flagged case can be raised as an emergency as it stands.
+    """
+
+    def __init__(self, weights, high_score=13, medium_score=7, critical_weight=7):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.high_score = high_score
+        self.medium_score = medium_score
+        self.critical_weight = critical_weight
+
+    @classmethod
+    def from_frame(cls, columns, frame, **thresholds):
+        """
+        Align the Symptom/weight rows of frame with columns. Columns with
+        no weight in the dataset get the median weight.
+        """
+        by_key = {}
+        for symptom, weight in zip(frame['Symptom'], frame['weight']):
+            by_key.setdefault(_weight_key(symptom), float(weight))
+        default = float(np.median(list(by_key.values())))
+        return cls([by_key.get(_weight_key(column), default) for column in columns], **thresholds)
+
+    def assess(self, matrix):
+        """
+        Risk for each row of a (n, n_symptoms) 0/1 matrix, as a list of
+        {"score", "level", "priority_level", "high_risk"} dicts.
+        """
+        matrix = np.asarray(matrix)
+        scores = matrix @ self.weights
+        peaks = (matrix * self.weights).max(axis=1)
+        high = (scores >= self.high_score) | (peaks >= self.critical_weight)
+        levels = np.where(high, 2, np.where(scores >= self.medium_score, 1, 0))
+        return [
+            {
+                'score': int(score),
+                'level': RISK_LEVELS[level],
+                # models.emergency.PRIORITY_LEVELS
+                'priority_level': int(level) + 1,
+                'high_risk': bool(level == 2),
+            }
+            for score, level in zip(scores, levels)
+        ]
@@ -0,0 +1,84 @@
+import hashlib
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from .matcher import normalize_symptom
+
+
+class SymptomSuggester:
+    """
+    Prefix index over the symptom vocabulary for autocomplete.
+
+    Every word-start suffix of each normalised name ('chest pain' and
+    'pain') is kept in one sorted list, so a lookup is two bisects and a
+    scan of the matches. Matches at the start of a name rank first, then
+    symptoms that are more common in symtoms_df.csv, then by name.
+    """
+
+    def __init__(self, columns, counts=None, limit=10):
+        counts = counts or {}
+        self.limit = limit
+        self.columns = []
+        self.labels = []
+        self._popularity = []
+
+        entries = []
+        seen = set()
+        for column in columns:
+            # Skip repeated headers such as 'fluid_overload.1'
+            label = normalize_symptom(re.sub(r'\.\d+$', '', str(column)))
+            if label in seen:
+                continue
+            seen.add(label)
+            position = len(self.columns)
+            self.columns.append(str(column))
+            self.labels.append(label)
+            self._popularity.append(counts.get(label, 0))
+
+            words = label.split(' ')
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), start > 0, position))
+
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+        self.etag = hashlib.sha1('\n'.join(self.columns).encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_frame(cls, columns, frame, **kwargs):
+        """
+        Build the index with popularity counted from the Symptom_* columns
+        of symtoms_df.csv.
+        """
+        counts = Counter()
+        for name in frame.columns:
+            if name.startswith('Symptom'):
+                counts.update(normalize_symptom(value) for value in frame[name].dropna())
+        return cls(columns, counts=counts, **kwargs)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def vocabulary(self):
+        return [{'symptom': column, 'label': label} for column, label in zip(self.columns, self.labels)]
+
+    def suggest(self, query, limit=None):
+        """
+        Up to limit {"symptom", "label"} dicts whose name, or a word in
+        it, starts with query.
+        """
+        prefix = normalize_symptom(query)
+        if not prefix:
+            return []
+
+        low = bisect_left(self._keys, prefix)
+        high = bisect_left(self._keys, prefix + '\uffff', low)
+        ranks = {}
+        for _, inner, position in self._entries[low:high]:
+            rank = (inner, -self._popularity[position], self.labels[position])
+            if position not in ranks or rank < ranks[position]:
+                ranks[position] = rank
+
+        best = sorted(ranks, key=ranks.__getitem__)[:limit or self.limit]
+        return [{'symptom': self.columns[position], 'label': self.labels[position]} for position in best]
@@ -32,12 +32,13 @@ class ChatMessage:
         return chat
 
 class ChatSession:
-    def __init__(self, user_id, status='active', created_at=None, current_step=None, appointment_data=None):
+    def __init__(self, user_id, status='active', created_at=None, current_step=None, appointment_data=None, version=0):
         self.user_id = user_id
         self.status = status
         self.created_at = created_at or datetime.utcnow()
         self.current_step = current_step or 'welcome'
         self.appointment_data = appointment_data or {}
+        self.version = version
 
     def to_dict(self):
         return {
@@ -45,7 +46,8 @@ class ChatSession:
             'status': self.status,
             'created_at': self.created_at,
             'current_step': self.current_step,
-            'appointment_data': self.appointment_data
+            'appointment_data': self.appointment_data,
+            'version': self.version
         }
 
     @staticmethod
@@ -55,7 +57,8 @@ class ChatSession:
             status=data.get('status', 'active'),
             created_at=data.get('created_at'),
             current_step=data.get('current_step', 'welcome'),
-            appointment_data=data.get('appointment_data', {})
+            appointment_data=data.get('appointment_data', {}),
+            version=data.get('version', 0)
         )
         if '_id' in data:
             session._id = data['_id']
@@ -1,6 +1,10 @@
 from datetime import datetime
 from bson import ObjectId
 
+# Numeric rank stored alongside the priority label so MongoDB can sort
+# on it (the labels themselves sort alphabetically: medium > low > high)
+PRIORITY_LEVELS = {'low': 1, 'medium': 2, 'high': 3}
+
 class EmergencyRequest:
     def __init__(self, patient_id, description, location, status='pending', priority='medium'):
         self.patient_id = patient_id
@@ -8,6 +12,7 @@ class EmergencyRequest:
         self.location = location
         self.status = status  # pending, in_progress, resolved
         self.priority = priority  # low, medium, high
+        self.priority_level = PRIORITY_LEVELS.get(priority, PRIORITY_LEVELS['medium'])
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
 
@@ -18,6 +23,7 @@ class EmergencyRequest:
             'location': self.location,
             'status': self.status,
             'priority': self.priority,
+            'priority_level': self.priority_level,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
@@ -1,6 +1,6 @@
 from bson import ObjectId
 from datetime import datetime
-from pymongo import MongoClient
+from config.database import mongo
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User:
@@ -16,9 +16,7 @@ class User:
     
     @staticmethod
     def find_by_email(email):
-        client = MongoClient('mongodb://localhost:27017/')
-        db = client['smart_healthcare']
-        user_data = db.users.find_one({'email': email})
+        user_data = mongo.db.users.find_one({'email': email})
         if user_data:
             user = User(
                 email=user_data['email'],
@@ -33,8 +31,6 @@ class User:
         return None
     
     def save(self):
-        client = MongoClient('mongodb://localhost:27017/')
-        db = client['smart_healthcare']
         user_data = {
             'email': self.email,
             'password': self.password,
@@ -45,7 +41,7 @@ class User:
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
-        result = db.users.insert_one(user_data)
+        result = mongo.db.users.insert_one(user_data)
         self.id = str(result.inserted_id)
     
     def to_dict(self):
@@ -63,9 +59,7 @@ class User:
     @staticmethod
     def find_by_id(user_id):
         try:
-            client = MongoClient('mongodb://localhost:27017/')
-            db = client['smart_healthcare']
-            user_data = db.users.find_one({'_id': ObjectId(user_id)})
+            user_data = mongo.db.users.find_one({'_id': ObjectId(user_id)})
             if user_data:
                 user = User(
                     email=user_data['email'],
@@ -1,30 +1,75 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.appointment import Appointment
+from config import Config
 from config.database import mongo
+from cache import TTLCache
+from routes.pagination import id_filter, paginated_response, serialize_document
+from events import publish
+from pymongo import ASCENDING, ReturnDocument
 from datetime import datetime, timedelta
+from dateutil import parser
 
 appointments_bp = Blueprint('appointments', __name__)
 
+# Fields rendered by the appointment lists
+APPOINTMENT_FIELDS = {
+    'patient_name': 1, 'patient_age': 1, 'patient_email': 1, 'patient_contact': 1,
+    'condition': 1, 'appointment_time': 1, 'status': 1, 'doctor_id': 1
+}
+APPOINTMENT_SORT = [('appointment_time', ASCENDING), ('_id', ASCENDING)]
+
+# Short-lived per-doctor dashboard stats; dropped whenever one of the
+# doctor's appointments is created or changes status
+stats_cache = TTLCache(
+    maxsize=Config.APPOINTMENT_STATS_CACHE_SIZE if Config.APPOINTMENT_STATS_CACHE_TTL > 0 else 0,
+    ttl=Config.APPOINTMENT_STATS_CACHE_TTL
+)
+
+def invalidate_doctor_stats(doctor_id):
+    if doctor_id:
+        stats_cache.pop(doctor_id)
+
+def appointment_changed(topic, appointment):
+    """
+    Drop the doctor's cached stats and push the change to live dashboards.
+    """
+    invalidate_doctor_stats(appointment.get('doctor_id'))
+    publish(topic, serialize_document(appointment))
+
 @appointments_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_appointment():
     current_user = get_jwt_identity()
     data = request.get_json()
     
+    missing = [field for field in ('patient_name', 'patient_age', 'patient_contact', 'appointment_time')
+               if not data.get(field)]
+    if missing:
+        return jsonify({'error': f"Missing fields: {', '.join(missing)}"}), 400
+    try:
+        appointment_time = parser.parse(data['appointment_time'])
+    except (ValueError, OverflowError):
+        return jsonify({'error': 'Invalid appointment_time'}), 400
+    
     # Create new appointment
     appointment = Appointment(
-        patient_id=current_user['email'],
-        doctor_id=data['doctor_id'],
-        date=data['date'],
-        time=data['time'],
-        reason=data.get('reason')
+        patient_name=data['patient_name'],
+        patient_age=data['patient_age'],
+        patient_email=data.get('patient_email') or current_user['email'],
+        patient_contact=data['patient_contact'],
+        condition=data.get('condition'),
+        appointment_time=appointment_time,
+        doctor_id=data.get('doctor_id')
     )
     
     # Insert appointment into database
-    mongo.db.appointments.insert_one(appointment.to_dict())
+    document = appointment.to_dict()
+    document['patient_id'] = current_user['email']
+    mongo.db.appointments.insert_one(document)
+    appointment_changed('appointment.created', document)
     
-    return jsonify({'message': 'Appointment created successfully'}), 201
+    return jsonify({'message': 'Appointment created successfully', 'id': str(document['_id'])}), 201
 
 @appointments_bp.route('/', methods=['GET'])
 @jwt_required()
@@ -33,11 +78,11 @@ def get_appointments():
     
     # Get appointments based on user role
     if current_user['role'] == 'doctor':
-        appointments = list(mongo.db.appointments.find({'doctor_id': current_user['email']}))
+        query = {'doctor_id': current_user['email']}
     else:
-        appointments = list(mongo.db.appointments.find({'patient_id': current_user['email']}))
+        query = {'patient_id': current_user['email']}
     
-    return jsonify([Appointment.from_dict(app).to_dict() for app in appointments]), 200
+    return paginated_response(mongo.db.appointments, query, APPOINTMENT_SORT, APPOINTMENT_FIELDS)
 
 @appointments_bp.route('/<appointment_id>', methods=['PUT'])
 @jwt_required()
@@ -46,22 +91,24 @@ def update_appointment(appointment_id):
     data = request.get_json()
     
     # Find appointment
-    appointment = mongo.db.appointments.find_one({'_id': appointment_id})
+    appointment = mongo.db.appointments.find_one(id_filter(appointment_id))
     if not appointment:
         return jsonify({'message': 'Appointment not found'}), 404
     
     # Check if user has permission to update
-    if current_user['role'] == 'patient' and appointment['patient_id'] != current_user['email']:
+    if current_user['role'] == 'patient' and appointment.get('patient_id') != current_user['email']:
         return jsonify({'message': 'Unauthorized'}), 403
     
     # Update appointment
     mongo.db.appointments.update_one(
-        {'_id': appointment_id},
+        {'_id': appointment['_id']},
         {'$set': {
             'status': data.get('status', appointment['status']),
             'updated_at': datetime.utcnow()
         }}
     )
+    appointment['status'] = data.get('status', appointment['status'])
+    appointment_changed('appointment.updated', appointment)
     
     return jsonify({'message': 'Appointment updated successfully'}), 200
 
@@ -84,10 +131,8 @@ def get_doctor_appointments():
             '$lt': datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)
         }
     
-    # Get appointments
-    appointments = list(mongo.db.appointments.find(query).sort('appointment_time', 1))
-    
-    return jsonify([Appointment.from_dict(appt).to_dict() for appt in appointments]), 200
+    # Get one page of appointments
+    return paginated_response(mongo.db.appointments, query, APPOINTMENT_SORT, APPOINTMENT_FIELDS)
 
 @appointments_bp.route('/<appointment_id>/status', methods=['PUT'])
 @jwt_required()
@@ -101,18 +146,20 @@ def update_appointment_status(appointment_id):
         return jsonify({'error': 'Invalid status'}), 400
     
     # Update appointment
-    result = mongo.db.appointments.update_one(
-        {'_id': appointment_id, 'doctor_id': current_user['email']},
+    appointment = mongo.db.appointments.find_one_and_update(
+        dict(id_filter(appointment_id), doctor_id=current_user['email']),
         {
             '$set': {
                 'status': data['status'],
                 'updated_at': datetime.utcnow()
             }
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count == 0:
+    if appointment is None:
         return jsonify({'error': 'Appointment not found or unauthorized'}), 404
+    appointment_changed('appointment.updated', appointment)
     
     return jsonify({'message': 'Appointment status updated successfully'}), 200
 
@@ -120,35 +167,38 @@ def update_appointment_status(appointment_id):
 @jwt_required()
 def get_appointment_stats():
     current_user = get_jwt_identity()
-    
-    # Get total appointments
-    total = mongo.db.appointments.count_documents({'doctor_id': current_user['email']})
-    
-    # Get pending appointments
-    pending = mongo.db.appointments.count_documents({
-        'doctor_id': current_user['email'],
-        'status': 'pending'
-    })
-    
-    # Get confirmed appointments
-    confirmed = mongo.db.appointments.count_documents({
-        'doctor_id': current_user['email'],
-        'status': 'confirmed'
-    })
-    
-    # Get today's appointments
+    doctor_id = current_user['email']
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_appointments = mongo.db.appointments.count_documents({
-        'doctor_id': current_user['email'],
-        'appointment_time': {
-            '$gte': today,
-            '$lt': today + timedelta(days=1)
-        }
-    })
-    
-    return jsonify({
-        'total': total,
-        'pending': pending,
-        'confirmed': confirmed,
-        'today': today_appointments
-    }), 200 
\ No newline at end of file
+    
+    # Cached stats are only reused on the day they were computed for
+    cached = stats_cache.get(doctor_id)
+    if cached is not None and cached[0] == today:
+        return jsonify(cached[1]), 200
+    
+    # Count total, pending, confirmed and today's appointments in one pass
+    pipeline = [
+        {'$match': {'doctor_id': doctor_id}},
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'pending': {'$sum': {'$cond': [{'$eq': ['$status', 'pending']}, 1, 0]}},
+            'confirmed': {'$sum': {'$cond': [{'$eq': ['$status', 'confirmed']}, 1, 0]}},
+            'today': {'$sum': {'$cond': [
+                {'$and': [
+                    {'$gte': ['$appointment_time', today]},
+                    {'$lt': ['$appointment_time', today + timedelta(days=1)]}
+                ]}, 1, 0
+            ]}}
+        }}
+    ]
+    result = next(mongo.db.appointments.aggregate(pipeline), None) or {}
+    
+    stats = {
+        'total': result.get('total', 0),
+        'pending': result.get('pending', 0),
+        'confirmed': result.get('confirmed', 0),
+        'today': result.get('today', 0)
+    }
+    stats_cache.put(doctor_id, (today, stats))
+    
+    return jsonify(stats), 200
@@ -3,6 +3,11 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.chat import ChatMessage, ChatSession
 from models.appointment import Appointment
 from config.database import mongo
+from routes.appointments import appointment_changed
+from chat_store import FIRST_BOOKING_STEP, PROMPTS, TRANSITIONS, create_chat_store
+from config import Config
+from routes.pagination import paginated_response
+from pymongo import ASCENDING, DESCENDING
 import uuid
 import requests
 import os
@@ -11,38 +16,61 @@ from dateutil import parser
 
 chat_bp = Blueprint('chat', __name__)
 
-def validate_appointment_data(data):
-    required_fields = ['name', 'age', 'email', 'contact', 'address', 'time']
-    for field in required_fields:
-        if field not in data or not data[field]:
-            return False, f"Missing or empty {field}"
+MESSAGE_FIELDS = {'user_id': 1, 'message': 1, 'is_bot': 1, 'timestamp': 1, 'session_id': 1}
+SESSION_FIELDS = {'status': 1, 'created_at': 1, 'current_step': 1}
+
+# Sessions are read and written per request; messages are written behind
+# in batches
+chat_store = create_chat_store(
+    lambda: mongo.db,
+    flush_interval=Config.CHAT_FLUSH_INTERVAL_MS / 1000,
+    max_batch=Config.CHAT_FLUSH_BATCH,
+    max_retries=Config.CHAT_FLUSH_MAX_RETRIES
+)
+
+APPOINTMENT_FIELDS = ['name', 'age', 'email', 'contact', 'address', 'time']
+
+def validate_appointment_field(field, value):
+    # Returns an error message for one booking answer, or None if it is valid
+    if not value or not str(value).strip():
+        return f"Missing or empty {field}"
     
-    try:
-        # Validate age
-        age = int(data['age'])
+    if field == 'age':
+        try:
+            age = int(value)
+        except ValueError:
+            return "Invalid age"
         if age <= 0 or age > 120:
-            return False, "Invalid age"
-        
-        # Validate email format (basic check)
-        if '@' not in data['email'] or '.' not in data['email']:
-            return False, "Invalid email format"
-        
-        # Validate contact number (basic check)
-        if not data['contact'].isdigit() or len(data['contact']) < 10:
-            return False, "Invalid contact number"
-        
-        # Validate appointment time
+            return "Invalid age"
+    
+    # Validate email format (basic check)
+    elif field == 'email':
+        if '@' not in value or '.' not in value:
+            return "Invalid email format"
+    
+    # Validate contact number (basic check)
+    elif field == 'contact':
+        if not value.isdigit() or len(value) < 10:
+            return "Invalid contact number"
+    
+    elif field == 'time':
         try:
-            appointment_time = parser.parse(data['time'])
-            if appointment_time < datetime.now():
-                return False, "Appointment time cannot be in the past"
-        except:
-            return False, "Invalid appointment time format. Please use YYYY-MM-DD HH:MM"
-        
-    except Exception as e:
-        return False, str(e)
+            # A time with a UTC offset cannot be compared to local time
+            in_past = parser.parse(value) < datetime.now()
+        except (ValueError, OverflowError, TypeError):
+            return "Invalid appointment time format. Please use YYYY-MM-DD HH:MM"
+        if in_past:
+            return "Appointment time cannot be in the past"
     
-    return True, None
+    return None
+
+def validate_appointment_data(data):
+    # Returns (field, error) for the first invalid answer, or (None, None)
+    for field in APPOINTMENT_FIELDS:
+        error = validate_appointment_field(field, data.get(field))
+        if error:
+            return field, error
+    return None, None
 
 def generate_zoom_meeting_link():
     # This is a placeholder. In a real implementation, you would use the Zoom API
@@ -50,53 +78,55 @@ def generate_zoom_meeting_link():
     return f"https://zoom.us/j/{meeting_id}"
 
 def handle_appointment_booking(session, user_input):
-    steps = {
-        'name': 'Please enter your name:',
-        'age': 'Please enter your age:',
-        'email': 'Please enter your email address:',
-        'contact': 'Please enter your contact number:',
-        'address': 'Please enter your address:',
-        'time': 'Please enter your preferred appointment time (YYYY-MM-DD HH:MM):',
-        'complete': 'Thank you! Your appointment has been scheduled. We will send a confirmation email shortly.'
-    }
-    
     current_step = session.current_step
-    if current_step not in steps:
+    if current_step not in PROMPTS:
         return "Invalid step in appointment booking process."
     
-    if current_step != 'complete':
-        # Store the user's input for the current step
-        session.appointment_data[current_step] = user_input
-        
-        # Move to the next step
-        next_step = list(steps.keys())[list(steps.keys()).index(current_step) + 1]
-        session.current_step = next_step
-        
-        # Update session in database
-        mongo.db.chat_sessions.update_one(
-            {'_id': session._id},
-            {'$set': {'current_step': next_step, 'appointment_data': session.appointment_data}}
+    if current_step == 'complete':
+        return PROMPTS['complete']
+    
+    # Store the user's input for the current step and move to the next one;
+    # an invalid answer is asked again
+    error = validate_appointment_field(current_step, user_input)
+    if error:
+        return f"❌ {error}\n\n{PROMPTS[current_step]}"
+    session.appointment_data[current_step] = user_input.strip()
+    next_step = TRANSITIONS[current_step]
+    
+    # Check every answer before the session is completed, so it is never
+    # saved as complete with data the appointment would be refused for
+    if next_step == 'complete':
+        field, error = validate_appointment_data(session.appointment_data)
+        if field:
+            session.current_step = field
+            return f"❌ {error}\n\n{PROMPTS[field]}"
+    session.current_step = next_step
+    
+    # Return the prompt for the next step
+    return PROMPTS[next_step]
+
+def schedule_appointment(session):
+    # All answers collected: create and save the appointment. The address
+    # stays in the session's appointment_data; appointments have no field
+    # for it.
+    try:
+        appointment_time = parser.parse(session.appointment_data['time'])
+        appointment = Appointment(
+            patient_name=session.appointment_data['name'],
+            patient_age=int(session.appointment_data['age']),
+            patient_email=session.appointment_data['email'],
+            patient_contact=session.appointment_data['contact'],
+            condition=None,
+            appointment_time=appointment_time,
+            status='pending'
         )
-        
-        # Return the prompt for the next step
-        return steps[next_step]
-    else:
-        # Create and save the appointment
-        try:
-            appointment_time = parser.parse(session.appointment_data['time'])
-            appointment = Appointment(
-                patient_name=session.appointment_data['name'],
-                patient_age=int(session.appointment_data['age']),
-                patient_email=session.appointment_data['email'],
-                patient_contact=session.appointment_data['contact'],
-                address=session.appointment_data['address'],
-                appointment_time=appointment_time,
-                status='pending'
-            )
-            mongo.db.appointments.insert_one(appointment.to_dict())
-            return steps['complete']
-        except Exception as e:
-            return f"Error scheduling appointment: {str(e)}"
+        document = appointment.to_dict()
+        document['patient_id'] = session.user_id
+        mongo.db.appointments.insert_one(document)
+        appointment_changed('appointment.created', document)
+        return PROMPTS['complete']
+    except Exception as e:
+        return f"Error scheduling appointment: {str(e)}"
 
 @chat_bp.route('/start', methods=['POST'])
 @jwt_required()
@@ -108,8 +138,8 @@ def start_chat():
     session_id = str(uuid.uuid4())
     session._id = session_id
     
-    # Save session to database
-    mongo.db.chat_sessions.insert_one(session.to_dict())
+    # Save session
+    chat_store.start(session)
     
     # Send welcome message
     welcome_message = ChatMessage(
@@ -119,7 +149,7 @@ def start_chat():
         session_id=session_id
     )
     
-    mongo.db.chat_messages.insert_one(welcome_message.to_dict())
+    chat_store.writer.add_messages(welcome_message.to_dict())
     
     return jsonify(welcome_message.to_dict()), 200
 
@@ -132,13 +162,11 @@ def send_message():
     if not data or 'message' not in data:
         return jsonify({'error': 'Message is required'}), 400
     
-    # Get or create chat session
-    session = mongo.db.chat_sessions.find_one({'user_id': current_user['email'], 'status': 'active'})
+    # Get the active chat session
+    session = chat_store.get_active(current_user['email'])
     if not session:
         return jsonify({'error': 'No active chat session. Please start a new chat.'}), 400
     
-    session = ChatSession.from_dict(session)
-    
     # Create user message
     user_message = ChatMessage(
         user_id=current_user['email'],
@@ -146,11 +174,9 @@ def send_message():
         session_id=str(session._id)
     )
     
-    # Insert user message
-    mongo.db.chat_messages.insert_one(user_message.to_dict())
-    
     # Process user input and generate bot response
     bot_response = None
+    previous_step = session.current_step
     if session.current_step == 'welcome':
         if data['message'] == '1':
             # Generate Zoom meeting link for online consultation
@@ -158,21 +184,26 @@ def send_message():
             bot_response = f"✅ Your online consultation has been scheduled!\n\nHere's your Zoom meeting link:\n{zoom_link}\n\nThe meeting will start in 5 minutes. Please click the link to join."
             session.status = 'completed'
         elif data['message'] == '2':
-            session.current_step = 'name'
-            bot_response = "Please enter your name:"
+            session.current_step = FIRST_BOOKING_STEP
+            bot_response = PROMPTS[FIRST_BOOKING_STEP]
         else:
             bot_response = "❌ Invalid option. Please press:\n1 for online consultation\n2 for appointment booking"
     else:
         bot_response = handle_appointment_booking(session, data['message'])
     
     # Update session status if completed
-    if session.status == 'completed' or session.current_step == 'complete':
-        mongo.db.chat_sessions.update_one(
-            {'_id': session._id},
-            {'$set': {'status': 'completed'}}
-        )
+    if session.current_step == 'complete':
+        session.status = 'completed'
+    if not chat_store.save(session):
+        # Another request moved this session on since it was read
+        return jsonify({'error': 'Your chat was updated elsewhere. Please send your message again.'}), 409
+    
+    # Book only once the step is saved, so a refused save books nothing
+    if previous_step != 'complete' and session.current_step == 'complete':
+        bot_response = schedule_appointment(session)
     
-    # Create and save bot response
+    # Create the bot response; both messages are queued together so they
+    # land in the same insert_many
     bot_message = ChatMessage(
         user_id=current_user['email'],
         message=bot_response,
@@ -180,7 +211,7 @@ def send_message():
         session_id=str(session._id)
     )
     
-    mongo.db.chat_messages.insert_one(bot_message.to_dict())
+    chat_store.writer.add_messages(user_message.to_dict(), bot_message.to_dict())
     
     return jsonify(bot_message.to_dict()), 200
 
@@ -189,9 +220,39 @@ def send_message():
 def get_messages():
     current_user = get_jwt_identity()
     
-    # Get chat history for the user
+    # Get chat history for the user, including writes not yet flushed
+    chat_store.writer.flush()
     messages = list(mongo.db.chat_messages.find(
-        {'user_id': current_user['email']}
+        {'user_id': current_user['email']}, MESSAGE_FIELDS
     ).sort('timestamp', -1).limit(50))
     
-    return jsonify([ChatMessage.from_dict(msg).to_dict() for msg in messages]), 200 
\ No newline at end of file
+    return jsonify([ChatMessage.from_dict(msg).to_dict() for msg in messages]), 200 
+
+@chat_bp.route('/sessions', methods=['GET'])
+@jwt_required()
+def get_sessions():
+    current_user = get_jwt_identity()
+    chat_store.writer.flush()
+    
+    # Most recent conversations first
+    return paginated_response(
+        mongo.db.chat_sessions,
+        {'user_id': current_user['email']},
+        [('created_at', DESCENDING), ('_id', DESCENDING)],
+        SESSION_FIELDS
+    )
+
+@chat_bp.route('/sessions/<session_id>/messages', methods=['GET'])
+@jwt_required()
+def get_session_messages(session_id):
+    current_user = get_jwt_identity()
+    chat_store.writer.flush()
+    
+    # One conversation in order, a page at a time; a single indexed range
+    # read on (session_id, timestamp, _id)
+    return paginated_response(
+        mongo.db.chat_messages,
+        {'session_id': session_id, 'user_id': current_user['email']},
+        [('timestamp', ASCENDING), ('_id', ASCENDING)],
+        MESSAGE_FIELDS
+    )
@@ -1,17 +1,34 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.emergency import EmergencyRequest
+from models.emergency import EmergencyRequest, PRIORITY_LEVELS
+from config import Config
 from config.database import mongo
+from routes.pagination import id_filter, paginated_response, serialize_document
+from triage import OPEN_STATUS, QUEUE_SORT, TriageQueue
+from events import publish
+from pymongo import DESCENDING, ReturnDocument
 from datetime import datetime
 
 emergency_bp = Blueprint('emergency', __name__)
 
+# Fields rendered by the emergency lists
+EMERGENCY_FIELDS = {
+    'patient_id': 1, 'description': 1, 'location': 1, 'status': 1,
+    'priority': 1, 'priority_level': 1, 'created_at': 1, 'updated_at': 1
+}
+
+# Hot view of open emergencies for the doctors' triage queue
+triage_queue = TriageQueue(lambda: mongo.db.emergencies, refresh_interval=Config.TRIAGE_REFRESH_SECONDS)
+
 @emergency_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_emergency():
     current_user = get_jwt_identity()
     data = request.get_json()
     
+    if data.get('priority', 'medium') not in PRIORITY_LEVELS:
+        return jsonify({'error': 'Invalid priority'}), 400
+    
     # Create new emergency request
     emergency = EmergencyRequest(
         patient_id=current_user['email'],
@@ -21,7 +38,10 @@ def create_emergency():
     )
     
     # Insert emergency request into database
-    mongo.db.emergencies.insert_one(emergency.to_dict())
+    document = emergency.to_dict()
+    mongo.db.emergencies.insert_one(document)
+    triage_queue.add(document)
+    publish('emergency.created', serialize_document(document))
     
     return jsonify({'message': 'Emergency request created successfully'}), 201
 
@@ -32,13 +52,13 @@ def get_emergencies():
     
     # Get emergencies based on user role
     if current_user['role'] == 'doctor':
-        emergencies = list(mongo.db.emergencies.find().sort('priority', -1))
+        query = {}
+        sort = [('priority_level', DESCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]
     else:
-        emergencies = list(mongo.db.emergencies.find(
-            {'patient_id': current_user['email']}
-        ).sort('created_at', -1))
+        query = {'patient_id': current_user['email']}
+        sort = [('created_at', DESCENDING), ('_id', DESCENDING)]
     
-    return jsonify([EmergencyRequest.from_dict(emergency).to_dict() for emergency in emergencies]), 200
+    return paginated_response(mongo.db.emergencies, query, sort, EMERGENCY_FIELDS)
 
 @emergency_bp.route('/<emergency_id>', methods=['PUT'])
 @jwt_required()
@@ -47,7 +67,7 @@ def update_emergency(emergency_id):
     data = request.get_json()
     
     # Find emergency request
-    emergency = mongo.db.emergencies.find_one({'_id': emergency_id})
+    emergency = mongo.db.emergencies.find_one(id_filter(emergency_id))
     if not emergency:
         return jsonify({'message': 'Emergency request not found'}), 404
     
@@ -56,12 +76,60 @@ def update_emergency(emergency_id):
         return jsonify({'message': 'Unauthorized'}), 403
     
     # Update emergency request
+    status = data.get('status', emergency['status'])
     mongo.db.emergencies.update_one(
-        {'_id': emergency_id},
+        {'_id': emergency['_id']},
         {'$set': {
-            'status': data.get('status', emergency['status']),
+            'status': status,
             'updated_at': datetime.utcnow()
         }}
     )
+    emergency['status'] = status
+    triage_queue.add(emergency)
+    publish('emergency.updated', serialize_document({
+        field: emergency.get(field) for field in ('_id', 'patient_id', 'status', 'priority', 'priority_level')
+    }))
+    
+    return jsonify({'message': 'Emergency request updated successfully'}), 200 
+
+@emergency_bp.route('/queue', methods=['GET'])
+@jwt_required()
+def get_triage_queue():
+    current_user = get_jwt_identity()
+    if current_user['role'] != 'doctor':
+        return jsonify({'message': 'Unauthorized'}), 403
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), Config.PAGE_SIZE_MAX))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    # Next N open emergencies in dispatch order, from the in-process view
+    return jsonify([serialize_document(emergency) for emergency in triage_queue.peek(limit)]), 200
+
+@emergency_bp.route('/queue/claim', methods=['POST'])
+@jwt_required()
+def claim_emergency():
+    current_user = get_jwt_identity()
+    if current_user['role'] != 'doctor':
+        return jsonify({'message': 'Unauthorized'}), 403
+    
+    # Atomically take the highest-priority, oldest open emergency so two
+    # doctors never claim the same one
+    emergency = mongo.db.emergencies.find_one_and_update(
+        {'status': OPEN_STATUS},
+        {'$set': {
+            'status': 'in_progress',
+            'assigned_to': current_user['email'],
+            'updated_at': datetime.utcnow()
+        }},
+        sort=QUEUE_SORT,
+        projection=EMERGENCY_FIELDS,
+        return_document=ReturnDocument.AFTER
+    )
+    if not emergency:
+        return jsonify({'message': 'No open emergencies'}), 404
     
-    return jsonify({'message': 'Emergency request updated successfully'}), 200 
\ No newline at end of file
+    triage_queue.discard(emergency['_id'])
+    publish('emergency.claimed', serialize_document(emergency))
+    return jsonify(serialize_document(emergency)), 200
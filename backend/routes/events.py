@@ -0,0 +1,77 @@
+from flask import Blueprint, Response, json, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import Config
+from events import bus
+import threading
+import time
+
+events_bp = Blueprint('events', __name__)
+
+TOPICS = ('emergency', 'appointment')
+
+# Every open stream holds a server thread until it ends
+stream_slots = threading.BoundedSemaphore(Config.EVENTS_MAX_STREAMS)
+
+def _audience_filter(current_user):
+    email = current_user['email']
+    is_doctor = current_user['role'] == 'doctor'
+
+    def accept(topic, data):
+        # Doctors see every emergency and their own appointments; patients
+        # only see events about themselves
+        if topic.startswith('emergency.'):
+            return is_doctor or data.get('patient_id') == email
+        if is_doctor:
+            return data.get('doctor_id') == email
+        return email in (data.get('patient_id'), data.get('patient_email'))
+
+    return accept
+
+@events_bp.route('/stream', methods=['GET'])
+@jwt_required()
+def stream():
+    """
+    Server-sent events feed of emergency and appointment changes, so the
+    dashboards can update in place instead of re-polling the list routes.
+    Narrow it with ?topics=emergency or ?topics=appointment.
+
+    At most EVENTS_MAX_STREAMS streams are open per process; beyond that
+    the request gets 503. A stream ends after EVENTS_STREAM_SECONDS and
+    the browser's EventSource reconnects on its own.
+    """
+    current_user = get_jwt_identity()
+    requested = [t for t in request.args.get('topics', ','.join(TOPICS)).split(',') if t in TOPICS]
+
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({'error': 'Too many open event streams, try again shortly'}), 503, {'Retry-After': '5'}
+
+    subscription = bus.subscribe(requested or TOPICS, accept=_audience_filter(current_user))
+    heartbeat = Config.EVENTS_HEARTBEAT_SECONDS
+    deadline = time.monotonic() + Config.EVENTS_STREAM_SECONDS
+
+    def generate():
+        with subscription:
+            yield 'retry: 5000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if subscription.overflowed:
+                    # Events were dropped; tell the client to refetch
+                    subscription.overflowed = False
+                    yield 'event: resync\ndata: {}\n\n'
+                event = subscription.get(timeout=min(heartbeat, remaining))
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                topic, data = event
+                yield f'event: {topic}\ndata: {json.dumps(data)}\n\n'
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, including on disconnect
+    response.call_on_close(stream_slots.release)
+    response.call_on_close(subscription.close)
+    return response
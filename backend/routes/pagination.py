@@ -0,0 +1,109 @@
+import base64
+
+from bson import ObjectId, json_util
+from flask import Response, json, jsonify, request, stream_with_context
+from pymongo import ASCENDING
+
+from config import Config
+
+
+def encode_cursor(sort, document):
+    """
+    Opaque page token holding the sort-key values of the last document
+    on a page.
+    """
+    values = [document.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(token, sort):
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def keyset_filter(sort, values):
+    """
+    Filter matching documents strictly after values in the given sort
+    order, e.g. for [(a, 1), (_id, 1)]:
+    {a > v0} or {a == v0 and _id > v1}.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prefix: values[j] for j, (prefix, _) in enumerate(sort[:i])}
+        clause[field] = {'$gt' if direction == ASCENDING else '$lt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+
+def id_filter(document_id):
+    """
+    Filter for a document id taken from a URL. Documents inserted by the
+    routes get ObjectId keys, older ones may have string keys.
+    """
+    if ObjectId.is_valid(document_id):
+        return {'_id': {'$in': [ObjectId(document_id), document_id]}}
+    return {'_id': document_id}
+
+
+def serialize_document(document):
+    data = dict(document)
+    if '_id' in data:
+        data['id'] = str(data.pop('_id'))
+    return data
+
+
+def paginated_response(collection, query, sort, projection, serialize=serialize_document):
+    """
+    Stream one page of collection.find(query) as
+    {"items": [...], "next_cursor": "..."}.
+
+    Paging is keyset-based on the sort fields (which must end with _id so
+    the order is total), so each page is an indexed range read no matter
+    how deep the client pages. Only projected fields are fetched and items
+    are serialised one at a time as the cursor is consumed.
+    """
+    try:
+        limit = int(request.args.get('limit', Config.PAGE_SIZE_DEFAULT))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    limit = max(1, min(limit, Config.PAGE_SIZE_MAX))
+
+    token = request.args.get('cursor')
+    if token:
+        try:
+            query = {'$and': [query, keyset_filter(sort, decode_cursor(token, sort))]}
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    # Sort keys are needed to build the next cursor
+    projection = dict(projection, **{field: 1 for field, _ in sort})
+    cursor = collection.find(query, projection).sort(sort).limit(limit + 1)
+    # flask.json.dumps uses the app's JSON settings on every Flask version;
+    # stream_with_context keeps the app available while the body streams
+    dumps = json.dumps
+
+    @stream_with_context
+    def generate():
+        yield '{"items": ['
+        last = None
+        count = 0
+        has_more = False
+        for document in cursor:
+            if count == limit:
+                has_more = True
+                break
+            if count:
+                yield ','
+            yield dumps(serialize(document))
+            last = document
+            count += 1
+        cursor.close()
+        next_cursor = encode_cursor(sort, last) if has_more else None
+        yield '], "next_cursor": ' + dumps(next_cursor) + '}'
+
+    return Response(generate(), mimetype='application/json')
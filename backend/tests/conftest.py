@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from config.database import get_database, set_client
+
+
+@pytest.fixture
+def db():
+    """
+    A fresh in-memory MongoDB behind config.database for each test.
+    """
+    mongomock = pytest.importorskip('mongomock')
+    set_client(mongomock.MongoClient())
+    yield get_database()
+    set_client(None)
+
+
+@pytest.fixture
+def make_client(db):
+    """
+    Build a test client for the given (blueprint, url_prefix) pairs.
+    """
+    def make(*blueprints):
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key-that-is-long-enough'
+        # Identities are {'email', 'role'} dicts, as in the routes
+        app.config['JWT_VERIFY_SUB'] = False
+        JWTManager(app)
+        for blueprint, prefix in blueprints:
+            app.register_blueprint(blueprint, url_prefix=prefix)
+        client = app.test_client()
+
+        def headers(email, role):
+            with app.app_context():
+                token = create_access_token(identity={'email': email, 'role': role})
+            return {'Authorization': f'Bearer {token}'}
+
+        client.headers_for = headers
+        return client
+    return make
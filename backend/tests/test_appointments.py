@@ -0,0 +1,121 @@
+from events import bus
+from routes.appointments import appointments_bp, stats_cache
+
+
+def _client(make_client):
+    stats_cache.clear()
+    return make_client((appointments_bp, '/appointments'))
+
+
+def _create(client, patient, doctor='doc@example.com'):
+    return client.post('/appointments/', headers=patient, json={
+        'patient_name': 'Asha',
+        'patient_age': 34,
+        'patient_contact': '9999999999',
+        'condition': 'fever',
+        'appointment_time': '2030-01-15 10:30',
+        'doctor_id': doctor,
+    })
+
+
+def test_create_update_and_status_change(make_client, db):
+    client = _client(make_client)
+    patient = client.headers_for('pat@example.com', 'patient')
+    doctor = client.headers_for('doc@example.com', 'doctor')
+
+    with bus.subscribe(['appointment']) as events:
+        response = _create(client, patient)
+        assert response.status_code == 201
+        appointment_id = response.get_json()['id']
+        assert events.get(timeout=1)[0] == 'appointment.created'
+
+        response = client.put(f'/appointments/{appointment_id}', headers=patient, json={'status': 'cancelled'})
+        assert response.status_code == 200
+        topic, data = events.get(timeout=1)
+        assert (topic, data['status']) == ('appointment.updated', 'cancelled')
+
+        response = client.put(f'/appointments/{appointment_id}/status', headers=doctor, json={'status': 'confirmed'})
+        assert response.status_code == 200
+        topic, data = events.get(timeout=1)
+        assert (topic, data['status'], data['id']) == ('appointment.updated', 'confirmed', appointment_id)
+
+    stored = db.appointments.find_one()
+    assert stored['status'] == 'confirmed'
+    assert stored['patient_id'] == 'pat@example.com'
+
+
+def test_status_change_refreshes_cached_stats(make_client, db):
+    client = _client(make_client)
+    patient = client.headers_for('pat@example.com', 'patient')
+    doctor = client.headers_for('doc@example.com', 'doctor')
+
+    appointment_id = _create(client, patient).get_json()['id']
+    assert client.get('/appointments/stats', headers=doctor).get_json()['pending'] == 1
+
+    client.put(f'/appointments/{appointment_id}/status', headers=doctor, json={'status': 'confirmed'})
+    stats = client.get('/appointments/stats', headers=doctor).get_json()
+    assert (stats['pending'], stats['confirmed']) == (0, 1)
+
+
+def test_status_change_by_other_doctor_is_rejected(make_client, db):
+    client = _client(make_client)
+    patient = client.headers_for('pat@example.com', 'patient')
+    other = client.headers_for('other@example.com', 'doctor')
+
+    appointment_id = _create(client, patient).get_json()['id']
+    response = client.put(f'/appointments/{appointment_id}/status', headers=other, json={'status': 'confirmed'})
+    assert response.status_code == 404
+
+
+def test_create_requires_fields(make_client, db):
+    client = _client(make_client)
+    response = client.post('/appointments/', headers=client.headers_for('pat@example.com', 'patient'), json={})
+    assert response.status_code == 400
+
+
+def test_list_pages_with_a_cursor(make_client, db):
+    client = _client(make_client)
+    patient = client.headers_for('pat@example.com', 'patient')
+    created = [_create(client, patient).get_json()['id'] for _ in range(5)]
+
+    seen = []
+    cursor = None
+    while True:
+        query = f'?limit=2&cursor={cursor}' if cursor else '?limit=2'
+        page = client.get(f'/appointments/{query}', headers=patient).get_json()
+        assert len(page['items']) <= 2
+        seen.extend(item['id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(created)
+
+    response = client.get('/appointments/?cursor=not-a-cursor', headers=patient)
+    assert response.status_code == 400
+
+
+def test_stats_are_cached_until_the_doctors_appointments_change(make_client, db):
+    client = _client(make_client)
+    patient = client.headers_for('pat@example.com', 'patient')
+    doctor = client.headers_for('doc@example.com', 'doctor')
+    other = client.headers_for('other@example.com', 'doctor')
+
+    appointment_id = _create(client, patient).get_json()['id']
+    _create(client, patient, doctor='other@example.com')
+    assert client.get('/appointments/stats', headers=doctor).get_json()['total'] == 1
+    assert client.get('/appointments/stats', headers=other).get_json()['total'] == 1
+
+    # Writes that bypass the routes are not seen while the entry is cached
+    db.appointments.insert_one({'doctor_id': 'doc@example.com', 'status': 'pending'})
+    assert client.get('/appointments/stats', headers=doctor).get_json()['total'] == 1
+
+    # Creating an appointment drops that doctor's entry only
+    _create(client, patient)
+    assert client.get('/appointments/stats', headers=doctor).get_json()['total'] == 3
+    assert stats_cache.get('other@example.com') is not None
+
+    # So does a patient's update
+    db.appointments.insert_one({'doctor_id': 'doc@example.com', 'status': 'pending'})
+    client.put(f'/appointments/{appointment_id}', headers=patient, json={'status': 'cancelled'})
+    stats = client.get('/appointments/stats', headers=doctor).get_json()
+    assert (stats['total'], stats['pending']) == (4, 3)
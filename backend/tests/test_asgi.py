@@ -0,0 +1,87 @@
+import asyncio
+import importlib
+import os
+import re
+from importlib.metadata import version
+
+import pytest
+from flask import Flask, request
+
+pytest.importorskip('a2wsgi')
+from a2wsgi import WSGIMiddleware
+
+
+@pytest.fixture
+def asgi(db):
+    # With the in-memory database the app imports without a MongoDB server
+    return importlib.import_module('asgi')
+
+
+class SlowClient:
+    """
+    Sends a request body in chunks and records the response.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.received = 0
+        self.sent = []
+
+    async def receive(self):
+        if self.received < len(self.chunks):
+            self.received += 1
+            return {'type': 'http.request', 'body': self.chunks[self.received - 1],
+                    'more_body': self.received < len(self.chunks)}
+        # Nothing more until the client goes away
+        await asyncio.sleep(3600)
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    def post(self, application):
+        length = str(len(b''.join(self.chunks))).encode()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'POST', 'scheme': 'http', 'path': '/echo', 'raw_path': b'/echo',
+            'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'test'), (b'content-length', length)],
+            'client': ('127.0.0.1', 1), 'server': ('test', 80),
+        }
+        asyncio.run(asyncio.wait_for(application(scope, self.receive, self.send), 5))
+        body = b''.join(message.get('body', b'') for message in self.sent[1:])
+        return self.sent[0]['status'], body
+
+
+def test_asgi_runs_on_the_pinned_a2wsgi(asgi):
+    # send_queue_size needs a2wsgi 1.10.1 or later
+    requirements = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'requirements.txt')
+    with open(requirements) as f:
+        pinned = re.search(r'^a2wsgi==(\S+)', f.read(), re.M).group(1)
+    assert version('a2wsgi') == pinned
+    assert isinstance(asgi.application, asgi.BufferedBody)
+
+
+def echo_app(client, seen):
+    app = Flask(__name__)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        # How many chunks the client had sent when the handler started
+        seen.append(client.received)
+        return request.get_data()
+
+    return app
+
+
+def test_body_is_buffered_before_the_app_runs(asgi):
+    client, seen = SlowClient([b'abc', b'def', b'ghi']), []
+    application = asgi.BufferedBody(WSGIMiddleware(echo_app(client, seen), send_queue_size=0), max_size=1024)
+    assert client.post(application) == (200, b'abcdefghi')
+    assert seen == [3]
+
+
+def test_oversized_body_is_refused(asgi):
+    client, seen = SlowClient([b'abc', b'def']), []
+    application = asgi.BufferedBody(WSGIMiddleware(echo_app(client, seen)), max_size=4)
+    assert client.post(application)[0] == 413
+    assert seen == []
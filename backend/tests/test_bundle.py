@@ -0,0 +1,45 @@
+import numpy as np
+
+from inference import get_engine
+
+
+def sample_inputs(columns, rows=200, seed=0):
+    # Sparse random symptom sets, as the routes build them
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, len(columns))) < 0.03).astype(np.float64)
+
+
+def test_top_k_is_ordered_and_led_by_predict():
+    bundle = get_engine().bundle
+    matrix = sample_inputs(bundle.columns)
+    labels, probabilities = bundle.top_k(matrix, 5)
+    assert labels.shape == probabilities.shape == (len(matrix), 5)
+
+    assert labels[:, 0].tolist() == bundle.predict(matrix).tolist()
+    assert np.all(np.diff(probabilities, axis=1) <= 0)
+
+    # The same winners as a full sort of predict_proba
+    proba = bundle.predict_proba(matrix)
+    expected = np.sort(proba, axis=1)[:, ::-1][:, :5]
+    np.testing.assert_allclose(probabilities, expected)
+    assert set(labels[0]) == set(bundle.labels[np.argsort(-proba[0])[:5]])
+
+
+def test_top_k_is_clamped_to_the_label_count():
+    bundle = get_engine().bundle
+    matrix = sample_inputs(bundle.columns, rows=3)
+    labels, probabilities = bundle.top_k(matrix, len(bundle.labels) + 10)
+    assert labels.shape == (3, len(bundle.labels))
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    assert bundle.top_k(matrix, 0)[0].shape == (3, 1)
+
+
+def test_differential_matches_predict():
+    engine = get_engine()
+    matrix = sample_inputs(engine.columns, rows=20, seed=1)
+    differentials = engine.differential(matrix, 3)
+    predicted = engine.bundle.predict(matrix)
+    for differential, disease in zip(differentials, predicted):
+        assert [entry['disease'] for entry in differential][0] == str(disease)
+        assert len(differential) == 3
+        assert {'probability', 'description', 'medications'} <= set(differential[0])
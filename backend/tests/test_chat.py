@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from chat_store import ChatSessionStore, WriteBehindWriter
+from models.chat import ChatSession
+from routes.chat import chat_bp, chat_store
+
+PATIENT = 'patient@example.com'
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((chat_bp, '/api/chat'))
+
+
+def send(client, headers, message):
+    return client.post('/api/chat/messages', json={'message': message}, headers=headers)
+
+
+def test_booking_creates_appointment(client, db):
+    headers = client.headers_for(PATIENT, 'patient')
+    assert client.post('/api/chat/start', headers=headers).status_code == 200
+
+    when = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M')
+    for answer in ('2', 'Asha', '34', PATIENT, '9876543210', 'Village Road 4', when):
+        response = send(client, headers, answer)
+        assert response.status_code == 200, response.get_json()
+    assert response.get_json()['message'].startswith('Thank you!')
+
+    appointment = db.appointments.find_one({'patient_id': PATIENT})
+    assert appointment['patient_name'] == 'Asha'
+    assert appointment['patient_age'] == 34
+    assert appointment['condition'] is None
+    assert db.chat_sessions.find_one({'user_id': PATIENT})['status'] == 'completed'
+
+    chat_store.writer.flush()
+    assert db.chat_messages.count_documents({'user_id': PATIENT}) == 15
+
+
+def test_stale_session_is_not_saved(db):
+    # Two workers read the same session; the second save must not win
+    store = ChatSessionStore(lambda: db, writer=None)
+    session = ChatSession(user_id=PATIENT)
+    session._id = 'session-1'
+    store.start(session)
+
+    first = store.get_active(PATIENT)
+    second = store.get_active(PATIENT)
+    first.current_step = 'name'
+    assert store.save(first)
+    second.current_step = 'welcome'
+    assert not store.save(second)
+    assert db.chat_sessions.find_one({'_id': 'session-1'})['current_step'] == 'name'
+
+
+def test_start_closes_previous_session(db):
+    store = ChatSessionStore(lambda: db, writer=None)
+    for session_id in ('session-1', 'session-2'):
+        session = ChatSession(user_id=PATIENT)
+        session._id = session_id
+        store.start(session)
+    assert store.get_active(PATIENT)._id == 'session-2'
+    assert db.chat_sessions.count_documents({'user_id': PATIENT, 'status': 'active'}) == 1
+
+
+def test_flush_retry_skips_messages_already_written(db):
+    writer = WriteBehindWriter(lambda: db, flush_interval=60)
+    messages = [{'user_id': PATIENT, 'message': str(i)} for i in range(3)]
+    writer.add_messages(*messages)
+    # A partial write from a failed flush, then the retry
+    db.chat_messages.insert_one(dict(messages[0]))
+    writer.flush()
+    writer.close()
+    assert writer.pending() == 0
+    assert db.chat_messages.count_documents({}) == 3
+
+
+def test_invalid_answers_are_asked_again(client, db):
+    headers = client.headers_for(PATIENT, 'patient')
+    assert client.post('/api/chat/start', headers=headers).status_code == 200
+    for answer in ('2', 'Asha'):
+        send(client, headers, answer)
+
+    response = send(client, headers, 'thirty')
+    assert response.get_json()['message'] == '❌ Invalid age\n\nPlease enter your age:'
+    assert db.chat_sessions.find_one({'user_id': PATIENT})['current_step'] == 'age'
+
+    past = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d %H:%M')
+    for answer in ('34', PATIENT, '9876543210', 'Village Road 4', past):
+        response = send(client, headers, answer)
+    assert response.get_json()['message'].startswith('❌ Appointment time cannot be in the past')
+    session = db.chat_sessions.find_one({'user_id': PATIENT})
+    assert (session['current_step'], session['status']) == ('time', 'active')
+    assert db.appointments.count_documents({}) == 0
+
+
+def test_booking_is_checked_before_completing(client, db):
+    headers = client.headers_for(PATIENT, 'patient')
+    assert client.post('/api/chat/start', headers=headers).status_code == 200
+    # Answers stored before they were validated one at a time
+    db.chat_sessions.update_one({'user_id': PATIENT, 'status': 'active'}, {'$set': {
+        'current_step': 'time',
+        'appointment_data': {'name': 'Asha', 'age': '340', 'email': PATIENT,
+                             'contact': '9876543210', 'address': 'Village Road 4'},
+    }})
+
+    when = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M')
+    response = send(client, headers, when)
+    assert response.get_json()['message'] == '❌ Invalid age\n\nPlease enter your age:'
+    session = db.chat_sessions.find_one({'user_id': PATIENT})
+    assert (session['current_step'], session['status']) == ('age', 'active')
+    assert db.appointments.count_documents({}) == 0
+
+
+class FailingMessages:
+    # A chat_messages collection that refuses every insert, or only the
+    # messages reject picks out
+    def __init__(self, reject=None):
+        self.reject = reject
+        self.chat_messages = self
+
+    def insert_many(self, messages, ordered=True):
+        if self.reject is None:
+            raise AutoReconnect('down')
+        raise BulkWriteError({'writeErrors': [
+            {'index': i, 'code': 121, 'errmsg': 'Document failed validation'}
+            for i, message in enumerate(messages) if self.reject(message)
+        ]})
+
+
+def test_failing_messages_are_dead_lettered(db):
+    writer = WriteBehindWriter(lambda: FailingMessages(), flush_interval=60,
+                               max_retries=3)
+    writer.add_messages({'user_id': PATIENT, 'message': 'hello'})
+    for _ in range(2):
+        writer.flush()
+    assert writer.pending() == 1
+    writer.flush()
+    assert writer.pending() == 0
+    assert [message['message'] for message in writer.dead_letters] == ['hello']
+
+
+def test_only_failed_messages_are_retried(db):
+    messages = [{'user_id': PATIENT, 'message': str(i)} for i in range(3)]
+    collection = FailingMessages(reject=lambda message: message['message'] == '1')
+    writer = WriteBehindWriter(lambda: collection, flush_interval=60, max_retries=2)
+    writer.add_messages(*messages)
+    writer.flush()
+    assert writer.pending() == 1
+    writer.flush()
+    assert writer.pending() == 0
+    assert list(writer.dead_letters) == [messages[1]]
+    assert writer._attempts == {}
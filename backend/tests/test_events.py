@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+import routes.events
+from __init__ import create_app
+from config import Config
+from events import publish
+
+DOCTOR = 'doctor@example.com'
+
+
+@pytest.fixture
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def headers(app):
+    with app.app_context():
+        token = create_access_token(identity={'email': DOCTOR, 'role': 'doctor'})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(routes.events, 'stream_slots', slots)
+    return slots
+
+
+def open_stream(app, headers, topics='appointment'):
+    return app.test_client().get(f'/api/events/stream?topics={topics}', headers=headers, buffered=False)
+
+
+def test_stream_is_registered_and_delivers_events(app, headers, slots, monkeypatch):
+    monkeypatch.setattr(Config, 'EVENTS_HEARTBEAT_SECONDS', 1)
+    response = open_stream(app, headers)
+    assert response.status_code == 200
+    chunks = response.iter_encoded()
+    assert next(chunks) == b'retry: 5000\n\n'
+
+    publish('appointment.created', {'doctor_id': DOCTOR, 'status': 'pending'})
+    publish('appointment.created', {'doctor_id': 'other@example.com', 'status': 'pending'})
+    event = next(chunks)
+    assert event.startswith(b'event: appointment.created\ndata: ')
+    assert b'"status":"pending"' in event.replace(b' ', b'')
+    assert next(chunks) == b': keepalive\n\n'
+    response.close()
+
+
+def test_stream_count_is_capped(app, headers, slots):
+    first = open_stream(app, headers)
+    assert first.status_code == 200
+
+    refused = open_stream(app, headers)
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '5'
+
+    # Closing a stream, even one never read, frees its slot
+    first.close()
+    second = open_stream(app, headers)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_stream_ends_after_its_lifetime(app, headers, slots, monkeypatch):
+    monkeypatch.setattr(Config, 'EVENTS_STREAM_SECONDS', 0)
+    response = open_stream(app, headers)
+    assert list(response.iter_encoded()) == [b'retry: 5000\n\n']
+    response.close()
+    assert slots.acquire(blocking=False)
@@ -0,0 +1,23 @@
+import pytest
+
+import config.indexes
+from __init__ import create_app
+from config import Config
+
+
+def test_create_app_does_not_touch_mongodb_by_default(monkeypatch):
+    def fail(db):
+        pytest.fail('create_app created indexes')
+
+    monkeypatch.setattr(config.indexes, 'ensure_indexes', fail)
+    assert not Config.MONGODB_ENSURE_INDEXES
+    create_app()
+
+
+def test_create_app_can_create_indexes(db):
+    class EnsureConfig(Config):
+        MONGODB_ENSURE_INDEXES = True
+
+    create_app(EnsureConfig)
+    assert 'email_unique' in db.users.index_information()
+    assert 'triage_queue' in db.emergencies.index_information()
@@ -0,0 +1,45 @@
+import logging
+from types import SimpleNamespace
+
+import pandas as pd
+
+from inference.engine import _validate
+from inference.knowledge import KnowledgeIndex
+
+
+def make_index(workout=True):
+    names = ['Diabetes', 'Peptic ulcer disease']
+    return KnowledgeIndex.from_frames(
+        pd.DataFrame({'Disease': names, 'Description': ['Sugar.', 'Ulcer.']}),
+        pd.DataFrame({'Disease': names, 'Medication': ["['Metformin']", "['Antacids']"]}),
+        pd.DataFrame({'Disease': names, 'Diet': ["['Low sugar']", "['Bland']"]}),
+        # precautions_df.csv uses the model's spelling
+        pd.DataFrame({'Disease': ['Diabetes ', 'Peptic ulcer diseae'],
+                      'Precaution_1': ['exercise', 'avoid fatty food']}),
+        pd.DataFrame({'disease': ['Diabetes', 'Diabetes', 'Peptic ulcer disease'],
+                      'workout': ['Walk daily', 'Eat balanced meals', 'Eat small meals']}) if workout else None,
+    )
+
+
+def test_model_labels_find_dataset_rows():
+    index = make_index()
+    # Model labels have trailing spaces and a misspelling
+    diabetes = index.details('Diabetes ')
+    assert diabetes['workouts'] == ['Walk daily', 'Eat balanced meals']
+    assert diabetes['precautions'] == ['exercise']
+    ulcer = index.details('Peptic ulcer diseae')
+    assert ulcer['description'] == 'Ulcer.'
+    assert ulcer['workouts'] == ['Eat small meals']
+    assert 'Peptic ulcer diseae' in index
+
+
+def test_validate_warns_per_missing_field(caplog):
+    engine = SimpleNamespace(
+        version='test', knowledge=make_index(workout=False), columns=[],
+        bundle=SimpleNamespace(labels=['Diabetes ', 'Peptic ulcer diseae']),
+        predict_many=lambda rows: [],
+    )
+    with caplog.at_level(logging.WARNING):
+        _validate(engine)
+    assert len(caplog.records) == 1
+    assert 'no workouts: Diabetes, Peptic ulcer diseae' in caplog.text
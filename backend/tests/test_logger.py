@@ -0,0 +1,37 @@
+import io
+import logging
+import logging.handlers
+import queue
+
+from config.logger import LOG_FORMAT, DeferredQueueHandler
+
+
+def test_records_are_formatted_by_the_listener():
+    log_queue = queue.SimpleQueue()
+    output = io.StringIO()
+    handler = logging.StreamHandler(output)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+
+    logger = logging.getLogger('test_logger')
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    try:
+        try:
+            raise ValueError('bad input')
+        except ValueError:
+            logger.exception("Failed on %s", 'row 3')
+
+        # Nothing was rendered on the calling thread
+        record = log_queue.get_nowait()
+        assert record.args == ('row 3',) and record.exc_info and record.exc_text is None
+        log_queue.put(record)
+
+        listener.start()
+        listener.stop()
+    finally:
+        logger.handlers.clear()
+        logger.propagate = True
+
+    assert '[test_logger] Failed on row 3' in output.getvalue()
+    assert 'ValueError: bad input' in output.getvalue()
@@ -0,0 +1,70 @@
+import difflib
+import os
+import pickle
+
+import pytest
+
+from inference.engine import BASE_DIR
+from inference.matcher import SymptomMatcher
+
+# Partial names, spacing variants and typos of the model's symptoms
+QUERIES = [
+    'fever', 'chest', 'appetite', 'belly', 'bowel movements', 'skin rash',
+    'Skin_Rash', 'itching', 'itchin', 'headache', 'head ache', 'vomitting',
+    'high fever', 'mild fever', 'joint pain', 'pain', 'cough', 'coughing',
+    'fatigue', 'tired', 'chills', 'shivering', 'stomach pain', 'acidity',
+    'yellow eyes', 'yellowing of eyes', 'dark urine', 'urine', 'nausea',
+    'breathlessness', 'breathless', 'weight loss', 'loss of appetite',
+    'swelling', 'dizziness', 'spinning', 'blurred vision', 'runny nose',
+    'congestion', 'sweating', 'dehydration', 'indigestion', 'constipation',
+    'diarrhea', 'diarrhoea', 'back pain', 'neck pain', 'muscle pain',
+    'spotting urination', 'foul smell of urine', 'dischromic patches',
+    'fluid overload', 'anxiety', 'depression', 'irritability', 'coma',
+    'xyz', 'qqqqqq', 'a',
+    # Share no trigram with their best match
+    'oguh', 'unasa', 'icdiyt', 'romrtign',
+]
+
+
+@pytest.fixture(scope='module')
+def columns():
+    with open(os.path.join(BASE_DIR, 'col.pkl'), 'rb') as f:
+        return list(pickle.load(f))
+
+
+def _baseline(query, columns):
+    # What the prediction route did before the matcher existed
+    matches = difflib.get_close_matches(query.strip().lower().replace('_', ' '), columns, n=1, cutoff=0.6)
+    return matches[0] if matches else None
+
+
+def test_matches_difflib_get_close_matches(columns):
+    matcher = SymptomMatcher(columns)
+    for query in QUERIES:
+        assert matcher.match_name(query) == _baseline(query, columns), query
+
+
+def test_every_column_matches_itself(columns):
+    matcher = SymptomMatcher(columns)
+    for column in columns:
+        assert matcher.match_name(column.replace('_', ' ')) == _baseline(column, columns)
+
+
+def test_scores_only_trigram_candidates(columns, monkeypatch):
+    matcher = SymptomMatcher(columns)
+    scored = []
+    best = matcher._best
+
+    def record(query, candidates):
+        candidates = list(candidates)
+        scored.append(len(candidates))
+        return best(query, candidates)
+
+    monkeypatch.setattr(matcher, '_best', record)
+    assert matcher.match_name('vomitting') == 'vomiting'
+    assert len(scored) == 1 and scored[0] <= matcher.max_candidates
+
+    # No trigram candidate is close enough, so every column is scored
+    scored.clear()
+    assert matcher.match_name('oguh') == 'cough'
+    assert scored[-1] == len(columns)
@@ -0,0 +1,95 @@
+import os
+import pickle
+
+import pytest
+
+import app as app_module
+import inference.engine as engine_module
+from inference import BundleError, ModelWatcher, get_engine, reload_engine
+from inference.bundle import current_version, export_sklearn, set_current
+from inference.engine import BASE_DIR
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """
+    An artifact root with bundles v1 (current), v2 and broken, whose
+    weights no longer match the manifest checksum.
+    """
+    loaded = {}
+    for name in ('model', 'encoder', 'col'):
+        with open(os.path.join(BASE_DIR, name + '.pkl'), 'rb') as f:
+            loaded[name] = pickle.load(f)
+    for version in ('v1', 'v2', 'broken'):
+        export_sklearn(str(tmp_path), loaded['model'], loaded['encoder'], loaded['col'], version=version)
+    with open(tmp_path / 'broken' / 'coef.npy', 'r+b') as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b'\xff' * 8)
+    set_current(str(tmp_path), 'v1')
+    return str(tmp_path)
+
+
+@pytest.fixture
+def engine(artifacts):
+    # Serve v1 from the test root, and put the real engine back afterwards
+    saved = engine_module._engine
+    yield reload_engine(artifact_dir=artifacts)
+    engine_module._engine = saved
+
+
+@pytest.fixture
+def client(engine, artifacts, monkeypatch):
+    monkeypatch.setattr(app_module, 'ARTIFACT_DIR', artifacts)
+    monkeypatch.setitem(app_module.app.config, 'MODEL_ADMIN_TOKEN', TOKEN)
+    return app_module.app.test_client()
+
+
+def test_watcher_swaps_to_the_current_bundle(engine, artifacts):
+    watcher = ModelWatcher(artifact_dir=artifacts)
+    assert not watcher.check()
+
+    set_current(artifacts, 'v2')
+    assert watcher.check()
+    assert get_engine().version == 'v2'
+    assert get_engine().generation == engine.generation + 1
+
+
+def test_watcher_keeps_serving_when_a_bundle_fails(engine, artifacts):
+    set_current(artifacts, 'broken')
+    watcher = ModelWatcher(artifact_dir=artifacts)
+    assert not watcher.check()
+    assert get_engine() is engine
+    # Not retried until CURRENT changes again
+    assert not watcher.check()
+
+
+def test_reload_rolls_back_on_a_bad_bundle(engine, artifacts):
+    with pytest.raises(BundleError):
+        reload_engine('broken', artifact_dir=artifacts)
+    assert get_engine() is engine
+    assert current_version(artifacts) == 'v1'
+
+
+def test_reload_route_needs_the_admin_token(client, monkeypatch):
+    assert client.post('/model/reload').status_code == 403
+    assert client.post('/model/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    monkeypatch.setitem(app_module.app.config, 'MODEL_ADMIN_TOKEN', '')
+    assert client.post('/model/reload', headers={'X-Admin-Token': ''}).status_code == 403
+
+
+def test_reload_route_switches_version(client, artifacts):
+    headers = {'X-Admin-Token': TOKEN}
+    response = client.post('/model/reload', json={'version': 'v9'}, headers=headers)
+    assert response.status_code == 404
+
+    response = client.post('/model/reload', json={'version': 'broken'}, headers=headers)
+    assert response.status_code == 422
+    assert get_engine().version == 'v1'
+
+    response = client.post('/model/reload', json={'version': 'v2'}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['version'] == 'v2'
+    assert current_version(artifacts) == 'v2'
+    assert client.get('/model').get_json()['available'] == ['broken', 'v1', 'v2']
@@ -0,0 +1,91 @@
+import pytest
+
+import app as app_module
+from inference import get_engine
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture
+def client():
+    app_module.prediction_cache.clear()
+    return app_module.app.test_client()
+
+
+def test_batch_matches_single_predictions(client):
+    cases = ['itching, skin_rash, nodal_skin_eruptions', ['cough', 'high_fever', 'breathlessness']]
+    response = client.post('/predict/batch', json={'cases': cases})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert len(results) == 2
+
+    for case, result in zip(cases, results):
+        symptoms = case if isinstance(case, str) else ', '.join(case)
+        single = client.post('/predict', json={'symptoms': symptoms}).get_json()
+        assert result['predicted_disease'] == single['predicted_disease']
+        assert result['risk'] == single['risk']
+
+
+def test_batch_reports_errors_per_case(client):
+    response = client.post('/predict/batch', json={'cases': ['itching', 'not a symptom', 42, '', ['chills']]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [('error' in result) for result in results] == [False, True, True, True, False]
+    assert results[0]['matched_symptoms'] == ['itching']
+    assert results[1] == {'error': 'Could not predict disease from provided symptoms'}
+
+
+def test_batch_limit(client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'PREDICT_BATCH_LIMIT', 2)
+    assert client.post('/predict/batch', json={'cases': ['itching'] * 2}).status_code == 200
+    response = client.post('/predict/batch', json={'cases': ['itching'] * 3})
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'Too many cases in one batch (max 2)'}
+
+
+@pytest.mark.parametrize('body, status', [
+    ({}, 400),
+    ({'cases': []}, 400),
+    ({'cases': 'itching'}, 400),
+    ({'cases': ['itching'], 'top_k': 0}, 400),
+])
+def test_batch_rejects_bad_requests(client, body, status):
+    assert client.post('/predict/batch', json=body).status_code == status
+
+
+def cache_stats(client):
+    return client.get('/predict/cache', headers={'X-Admin-Token': TOKEN}).get_json()
+
+
+def test_cache_key_is_the_matched_symptom_set(client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'MODEL_ADMIN_TOKEN', TOKEN)
+    before = cache_stats(client)
+
+    def predict(symptoms, **extra):
+        response = client.post('/predict', json=dict(extra, symptoms=symptoms))
+        assert response.status_code == 200
+        return response.get_json()
+
+    first = predict('itching, skin rash')
+    # Another spelling of the same symptoms is a hit
+    assert predict('Skin_Rash,  itching ') == first
+    # top_k changes the response, so it is part of the key
+    assert 'differential' in predict('itching, skin rash', top_k=3)
+    assert predict('itching, skin rash', top_k=3) != first
+
+    # A reloaded model starts from a fresh generation
+    monkeypatch.setattr(get_engine(), 'generation', get_engine().generation + 1)
+    predict('itching, skin rash')
+
+    stats = cache_stats(client)
+    assert stats['hits'] - before['hits'] == 2
+    assert stats['misses'] - before['misses'] == 3
+    assert stats['size'] == 3
+
+
+def test_cache_stats_need_the_admin_token(client, monkeypatch):
+    assert client.get('/predict/cache').status_code == 403
+    monkeypatch.setitem(app_module.app.config, 'MODEL_ADMIN_TOKEN', TOKEN)
+    assert client.get('/predict/cache').status_code == 403
+    assert client.get('/predict/cache', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.get('/predict/cache', headers={'X-Admin-Token': TOKEN}).status_code == 200
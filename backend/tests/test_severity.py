@@ -0,0 +1,73 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as app_module
+from inference import SeverityScorer, get_engine
+from inference.severity import _weight_key
+from models.emergency import PRIORITY_LEVELS
+
+
+def test_thresholds():
+    scorer = SeverityScorer([3, 4, 6, 7], high_score=13, medium_score=7, critical_weight=7)
+    risks = scorer.assess([
+        [1, 0, 0, 0],  # 3
+        [1, 1, 0, 0],  # 7: medium
+        [0, 1, 1, 0],  # 10
+        [1, 1, 1, 0],  # 13: high on score alone
+        [0, 0, 0, 1],  # 7, but a critical symptom
+    ])
+    assert [risk['score'] for risk in risks] == [3, 7, 10, 13, 7]
+    assert [risk['level'] for risk in risks] == ['low', 'medium', 'medium', 'high', 'high']
+    assert [risk['high_risk'] for risk in risks] == [False, False, False, True, True]
+
+
+def test_levels_are_emergency_priorities():
+    risks = SeverityScorer([1, 8], medium_score=1).assess([[0, 0], [1, 0], [0, 1]])
+    for risk in risks:
+        assert PRIORITY_LEVELS[risk['level']] == risk['priority_level']
+
+
+def test_weight_key_aligns_dataset_spellings():
+    assert _weight_key('foul_smell_of urine') == _weight_key('foul_smell_ofurine')
+    assert _weight_key('fluid_overload.1') == _weight_key('fluid_overload')
+    assert _weight_key(' Skin Rash ') == _weight_key('skin_rash')
+
+
+def test_from_frame_aligns_columns():
+    frame = pd.DataFrame({
+        'Symptom': ['itching', 'foul_smell_of urine', 'fluid_overload', 'fluid_overload', 'cough'],
+        'weight': [1, 5, 4, 6, 3],
+    })
+    columns = ['foul_smell_ofurine', 'fluid_overload.1', 'itching', 'not_in_dataset']
+    scorer = SeverityScorer.from_frame(columns, frame)
+    # First weight wins for repeated rows; unknown columns get the median
+    assert scorer.weights.tolist() == [5, 4, 1, 3.5]
+
+
+def test_engine_weights_every_column():
+    engine = get_engine()
+    assert engine.severity.weights.shape == (len(engine.columns),)
+    assert np.all(engine.severity.weights > 0)
+
+
+@pytest.fixture
+def high_risk_symptoms():
+    engine = get_engine()
+    heaviest = np.argsort(engine.severity.weights)[-3:]
+    return ', '.join(str(engine.columns[index]) for index in heaviest)
+
+
+def test_cached_high_risk_predictions_are_flagged(high_risk_symptoms, caplog):
+    app_module.prediction_cache.clear()
+    client = app_module.app.test_client()
+    for _ in range(2):
+        with caplog.at_level(logging.WARNING):
+            caplog.clear()
+            response = client.post('/predict', json={'symptoms': high_risk_symptoms})
+        assert response.status_code == 200
+        risk = response.get_json()['risk']
+        assert risk['high_risk'] and risk['priority_level'] == PRIORITY_LEVELS['high']
+        assert any('High-risk case' in record.getMessage() for record in caplog.records)
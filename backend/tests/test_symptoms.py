@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+import app as app_module
+from inference import SymptomQuestioner, SymptomSuggester
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_suggestions_rank_name_starts_then_popularity():
+    suggester = SymptomSuggester(
+        ['chest_pain', 'chills', 'cold_hands_and_feets', 'pain_behind_the_eyes', 'fluid_overload', 'fluid_overload.1'],
+        counts={'chills': 5, 'chest pain': 2}
+    )
+    assert len(suggester) == 5
+    assert [s['symptom'] for s in suggester.suggest('ch')] == ['chills', 'chest_pain']
+    assert [s['symptom'] for s in suggester.suggest('Pain')] == ['pain_behind_the_eyes', 'chest_pain']
+    assert [s['label'] for s in suggester.suggest('cold_h')] == ['cold hands and feets']
+    assert suggester.suggest('') == []
+    assert len(suggester.suggest('c', limit=1)) == 1
+
+
+def test_suggest_revalidates_with_etag(client):
+    response = client.get('/symptoms/suggest?q=che')
+    assert response.status_code == 200
+    assert 'chest_pain' in [s['symptom'] for s in response.get_json()['suggestions']]
+    assert 'public' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+
+    cached = client.get('/symptoms/suggest?q=che', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    # A different query is a different representation
+    other = client.get('/symptoms/suggest?q=cou', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+    assert other.headers['ETag'] != etag
+
+
+def test_vocabulary_revalidates_with_etag(client):
+    response = client.get('/symptoms')
+    assert response.status_code == 200
+    assert response.get_json()['version'] == app_module.get_engine().suggester.etag
+    etag = response.headers['ETag']
+    assert client.get('/symptoms', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_suggest_limit(client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'SYMPTOM_SUGGEST_MAX', 2)
+    assert len(client.get('/symptoms/suggest?q=c&limit=10').get_json()['suggestions']) == 2
+    assert client.get('/symptoms/suggest?q=c&limit=x').status_code == 400
+
+
+def brute_force_gain(flags, labels, cases, symptom):
+    # Information gain of asking about symptom, computed case by case
+    def entropy(subset):
+        if not subset:
+            return 0.0
+        counts = np.unique([labels[c] for c in subset], return_counts=True)[1] / len(subset)
+        return float(-(counts * np.log2(counts)).sum())
+    yes = [c for c in cases if flags[symptom, c]]
+    no = [c for c in cases if not flags[symptom, c]]
+    return entropy(cases) - (len(yes) * entropy(yes) + len(no) * entropy(no)) / len(cases)
+
+
+def make_questioner(flags, labels):
+    diseases = sorted(set(labels))
+    disease_flags = np.array([[label == disease for label in labels] for disease in diseases])
+    return SymptomQuestioner([f's{i}' for i in range(len(flags))], diseases, flags, disease_flags)
+
+
+def test_questions_are_ranked_by_information_gain():
+    labels = ['A', 'B', 'C', 'D']
+    flags = np.array([
+        [1, 1, 0, 0],  # splits the diseases in half: 1 bit
+        [1, 0, 0, 0],  # singles out A: 0.81 bits
+        [1, 1, 1, 1],  # everyone has it: nothing to learn
+    ], dtype=bool)
+    result = make_questioner(flags, labels).next_questions(limit=5)
+    assert [q['symptom'] for q in result['questions']] == ['s0', 's1']
+    assert [q['information_gain'] for q in result['questions']] == [1.0, 0.8113]
+    assert [q['probability'] for q in result['questions']] == [0.5, 0.25]
+    assert result['exact'] and result['cases'] == 4
+
+    # Answers narrow the cases and are not asked again
+    result = make_questioner(flags, labels).next_questions(present=[0])
+    assert [c['disease'] for c in result['candidates']] == ['A', 'B']
+    assert [q['symptom'] for q in result['questions']] == ['s1']
+    result = make_questioner(flags, labels).next_questions(present=[0], absent=[1])
+    assert result['candidates'] == [{'disease': 'B', 'probability': 1.0}]
+    assert result['questions'] == []
+
+
+def test_gain_matches_a_case_by_case_count():
+    # More than 64 cases, so the bitsets span several words
+    rng = np.random.default_rng(3)
+    labels = [f'd{i}' for i in rng.integers(0, 6, size=150)]
+    flags = rng.random((12, 150)) < 0.4
+    questioner = make_questioner(flags, labels)
+
+    present, absent = [2], [5]
+    cases = [c for c in range(150) if flags[2, c] and not flags[5, c]]
+    result = questioner.next_questions(present, absent, limit=12)
+    assert result['cases'] == len(cases)
+    gains = {q['symptom']: q['information_gain'] for q in result['questions']}
+    for symptom in set(range(12)) - {2, 5}:
+        expected = brute_force_gain(flags, labels, cases, symptom)
+        assert gains.get(f's{symptom}', 0.0) == pytest.approx(expected, abs=1e-4)
+    assert list(gains.values()) == sorted(gains.values(), reverse=True)
+
+
+def test_unknown_combinations_fall_back_to_any_present_symptom():
+    flags = np.array([[1, 0], [0, 1]], dtype=bool)
+    result = make_questioner(flags, ['A', 'B']).next_questions(present=[0, 1])
+    assert not result['exact'] and result['cases'] == 2
+
+
+def test_next_route(client):
+    response = client.post('/symptoms/next', json={'present': 'itching, skin_rash', 'absent': ['itching', 'chills']})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['present'] == ['itching', 'skin_rash']
+    assert result['absent'] == ['chills']
+    asked = {q['symptom'] for q in result['questions']}
+    assert asked and not asked & {'itching', 'skin_rash', 'chills'}
+    assert result['done'] is False
+    assert client.post('/symptoms/next', data='x').status_code == 415
+    assert client.post('/symptoms/next', json=[]).status_code == 400
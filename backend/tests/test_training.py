@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference.bundle import MANIFEST, current_version, load_bundle
+from training import pipeline
+
+
+@pytest.fixture
+def training_csv(tmp_path):
+    # Four rows per disease keeps the fit fast and every fold stratified
+    frame = pd.read_csv(pipeline.TRAINING_CSV)
+    frame = frame.groupby(pipeline.LABEL_COLUMN, group_keys=False).head(4)
+    path = tmp_path / 'Training.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_run_writes_a_bundle_matching_the_fitted_model(tmp_path, training_csv, monkeypatch):
+    fitted = []
+
+    def train(*args, **kwargs):
+        fitted.append(original(*args, **kwargs))
+        return fitted[-1]
+
+    original = pipeline.train
+    monkeypatch.setattr(pipeline, 'train', train)
+    root = str(tmp_path / 'artifacts')
+    report = str(tmp_path / 'report.json')
+    version, metrics = pipeline.run(root=root, path=training_csv, folds=2, jobs=1, version='t1',
+                                    activate=True, report=report)
+    assert version == 't1'
+    assert current_version(root) == 't1'
+
+    columns, X, y = pipeline.load_training_data(training_csv)
+    assert metrics['samples'] == len(y) == 4 * metrics['diseases']
+    assert metrics['symptoms'] == len(columns)
+    assert metrics['folds'] == 2
+    for name in pipeline.SCORING:
+        scores = metrics['cross_validation'][name]
+        assert len(scores['folds']) == 2
+        assert scores['mean'] == pytest.approx(np.mean(scores['folds']))
+        assert 0 <= scores['mean'] <= 1
+
+    with open(tmp_path / 'artifacts' / 't1' / MANIFEST) as f:
+        manifest = json.load(f)
+    assert manifest['metadata'] == {'source': 'Training.csv', 'metrics': metrics}
+    with open(report) as f:
+        assert json.load(f) == dict(metrics, version='t1')
+
+    model, encoder, _, _ = fitted[0]
+    bundle = load_bundle(tmp_path / 'artifacts' / 't1')
+    assert bundle.columns.tolist() == columns
+    expected = encoder.inverse_transform(model.predict(X))
+    assert bundle.predict(X).tolist() == expected.tolist()
+    np.testing.assert_allclose(bundle.predict_proba(X), model.predict_proba(X), rtol=1e-9, atol=1e-12)
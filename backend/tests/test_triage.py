@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from routes.emergency import emergency_bp, triage_queue
+from triage import TriageQueue
+
+
+@pytest.fixture
+def client(make_client):
+    triage_queue.clear()
+    yield make_client((emergency_bp, '/emergency'))
+    triage_queue.clear()
+
+
+def _create(client, priority, patient='pat@example.com'):
+    response = client.post('/emergency/', headers=client.headers_for(patient, 'patient'), json={
+        'description': f'{priority} case',
+        'location': 'Village Road 4',
+        'priority': priority,
+    })
+    assert response.status_code == 201
+
+
+def _queue(client, limit=10):
+    response = client.get(f'/emergency/queue?limit={limit}', headers=client.headers_for('doc@example.com', 'doctor'))
+    assert response.status_code == 200
+    return [item['description'] for item in response.get_json()]
+
+
+def test_queue_orders_by_priority_then_age(client, db):
+    for priority in ('low', 'high', 'medium', 'high'):
+        _create(client, priority)
+    # Loaded from MongoDB on first use, then kept up to date in process
+    assert _queue(client) == ['high case', 'high case', 'medium case', 'low case']
+    _create(client, 'medium')
+    assert _queue(client, limit=3) == ['high case', 'high case', 'medium case']
+    assert _queue(client)[2:4] == ['medium case', 'medium case']
+
+    oldest_high = db.emergencies.find_one({'priority': 'high'}, sort=[('created_at', 1)])
+    assert _queue(client, limit=1) == ['high case']
+    assert triage_queue.peek(1)[0]['_id'] == oldest_high['_id']
+
+
+def test_claims_take_the_queue_head_once(client, db):
+    for priority in ('low', 'high', 'medium'):
+        _create(client, priority)
+    assert len(_queue(client)) == 3
+
+    doctors = [client.headers_for(f'doc{i}@example.com', 'doctor') for i in range(4)]
+    claimed = [client.post('/emergency/queue/claim', headers=headers) for headers in doctors]
+    assert [response.status_code for response in claimed] == [200, 200, 200, 404]
+    assert [response.get_json()['priority'] for response in claimed[:3]] == ['high', 'medium', 'low']
+    for i, response in enumerate(claimed[:3]):
+        stored = db.emergencies.find_one({'priority': response.get_json()['priority']})
+        assert stored['assigned_to'] == f'doc{i}@example.com'
+
+    # Claimed emergencies leave the in-process view without a reload
+    assert _queue(client) == []
+    assert db.emergencies.count_documents({'status': 'in_progress'}) == 3
+
+    patient = client.headers_for('pat@example.com', 'patient')
+    assert client.post('/emergency/queue/claim', headers=patient).status_code == 403
+
+
+def test_resolved_emergencies_are_dropped(client, db):
+    for priority in ('high', 'low'):
+        _create(client, priority)
+    assert _queue(client) == ['high case', 'low case']
+
+    high = db.emergencies.find_one({'priority': 'high'})
+    patient = client.headers_for('pat@example.com', 'patient')
+    response = client.put(f"/emergency/{high['_id']}", headers=patient, json={'status': 'resolved'})
+    assert response.status_code == 200
+    assert _queue(client) == ['low case']
+
+
+def test_discarded_entries_are_dropped_when_peeked(db):
+    now = datetime(2030, 1, 1)
+    db.emergencies.insert_many([
+        {'_id': i, 'status': 'pending', 'priority_level': 3 - i % 3, 'created_at': now + timedelta(minutes=i)}
+        for i in range(300)
+    ])
+    queue = TriageQueue(lambda: db.emergencies)
+    assert [doc['_id'] for doc in queue.peek(3)] == [0, 3, 6]
+
+    for i in range(0, 300, 3):
+        queue.discard(i)
+    assert len(queue) == 200
+    assert [doc['_id'] for doc in queue.peek(3)] == [1, 4, 7]
+    # Peeking dropped the discarded entries it passed over
+    assert len(queue._heap) == 200
+
+
+def test_reload_picks_up_other_workers_changes(db):
+    now = [0.0]
+    queue = TriageQueue(lambda: db.emergencies, refresh_interval=30, clock=lambda: now[0])
+    db.emergencies.insert_one({'_id': 'a', 'status': 'pending', 'priority_level': 1, 'created_at': datetime(2030, 1, 1)})
+    assert [doc['_id'] for doc in queue.peek(5)] == ['a']
+
+    # Written by another process: not seen until the view is refreshed
+    db.emergencies.insert_one({'_id': 'b', 'status': 'pending', 'priority_level': 3, 'created_at': datetime(2030, 1, 2)})
+    db.emergencies.update_one({'_id': 'a'}, {'$set': {'status': 'in_progress'}})
+    now[0] = 29
+    assert [doc['_id'] for doc in queue.peek(5)] == ['a']
+    now[0] = 31
+    assert [doc['_id'] for doc in queue.peek(5)] == ['b']
@@ -0,0 +1,5 @@
+# Reproducible training of the disease classifier from data sets/Training.csv
+
+from .pipeline import TRAINING_CSV, load_training_data, run, train
+
+__all__ = ['TRAINING_CSV', 'load_training_data', 'train', 'run']
@@ -0,0 +1,39 @@
+"""
+Train the disease classifier and write a new model bundle:
+
+    cd backend
+    python -m training --activate
+
+Without --activate the bundle is written but not served; running servers
+switch to it once it is made current (python -m inference.bundle, or
+POST /model/reload).
+"""
+import argparse
+import json
+
+from inference.engine import ARTIFACT_DIR
+
+from .pipeline import TRAINING_CSV, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the disease classifier.')
+    parser.add_argument('--data', default=TRAINING_CSV, help='training CSV')
+    parser.add_argument('--root', default=ARTIFACT_DIR, help='bundle directory')
+    parser.add_argument('--version', help='bundle version name (default: a timestamp)')
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds')
+    parser.add_argument('--jobs', type=int, default=-1, help='parallel folds (-1 = all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--report', help='also write the metrics report to this JSON file')
+    parser.add_argument('--activate', action='store_true', help='make the new bundle current')
+    args = parser.parse_args(argv)
+
+    version, metrics = run(
+        root=args.root, path=args.data, folds=args.folds, jobs=args.jobs, seed=args.seed,
+        version=args.version, activate=args.activate, report=args.report
+    )
+    print(json.dumps(dict(metrics, version=version), indent=2))
+
+
+if __name__ == '__main__':
+    main()
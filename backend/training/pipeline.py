@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_validate
+from sklearn.preprocessing import LabelEncoder
+
+from inference.bundle import export_sklearn, set_current
+from inference.engine import ARTIFACT_DIR, BASE_DIR
+
+TRAINING_CSV = os.path.join(BASE_DIR, "data sets", "Training.csv")
+LABEL_COLUMN = 'prognosis'
+SCORING = ('accuracy', 'f1_macro')
+
+
+def load_training_data(path=TRAINING_CSV):
+    """
+    Read the training set with explicit dtypes: uint8 symptom flags and a
+    categorical label. Returns (columns, X, y) with X as a uint8 matrix.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {name: np.uint8 for name in header if name != LABEL_COLUMN}
+    dtypes[LABEL_COLUMN] = 'category'
+    frame = pd.read_csv(path, dtype=dtypes)
+
+    columns = [name for name in frame.columns if name != LABEL_COLUMN]
+    X = frame[columns].to_numpy(dtype=np.uint8)
+    y = frame[LABEL_COLUMN].astype(str).to_numpy()
+    return columns, X, y
+
+
+def build_model(seed=42):
+    return LogisticRegression(max_iter=1000, random_state=seed)
+
+
+def train(path=TRAINING_CSV, folds=5, jobs=-1, seed=42):
+    """
+    Cross-validate the classifier (folds run in parallel across jobs
+    processes), then fit it on the full data set. Returns
+    (model, encoder, columns, metrics).
+    """
+    columns, X, y = load_training_data(path)
+    encoder = LabelEncoder()
+    labels = encoder.fit_transform(y)
+
+    started = time.perf_counter()
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    scores = cross_validate(build_model(seed), X, labels, cv=splitter, scoring=SCORING, n_jobs=jobs)
+    cv_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model = build_model(seed).fit(X, labels)
+    fit_seconds = time.perf_counter() - started
+
+    metrics = {
+        'samples': int(X.shape[0]),
+        'symptoms': int(X.shape[1]),
+        'diseases': int(len(encoder.classes_)),
+        'folds': folds,
+        'seed': seed,
+        'cross_validation': {
+            name: {
+                'mean': float(np.mean(scores['test_' + name])),
+                'std': float(np.std(scores['test_' + name])),
+                'folds': [float(value) for value in scores['test_' + name]],
+            }
+            for name in SCORING
+        },
+        'train_accuracy': float(model.score(X, labels)),
+        'cv_seconds': round(cv_seconds, 3),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+    return model, encoder, columns, metrics
+
+
+def run(root=ARTIFACT_DIR, path=TRAINING_CSV, folds=5, jobs=-1, seed=42, version=None,
+        activate=False, report=None):
+    """
+    Train, write a new bundle under root with the metrics in its manifest,
+    and optionally make it current. Returns (version, metrics).
+    """
+    model, encoder, columns, metrics = train(path, folds=folds, jobs=jobs, seed=seed)
+    version = export_sklearn(root, model, encoder, columns, version=version, metadata={
+        'source': os.path.basename(path),
+        'metrics': metrics,
+    })
+    if report:
+        with open(report, 'w') as f:
+            json.dump(dict(metrics, version=version), f, indent=2)
+    if activate:
+        set_current(root, version)
+    return version, metrics
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+
+from models.emergency import PRIORITY_LEVELS
+
+# Dispatch order: highest priority first, oldest first within a priority
+QUEUE_SORT = [('priority_level', DESCENDING), ('created_at', ASCENDING), ('_id', ASCENDING)]
+OPEN_STATUS = 'pending'
+
+QUEUE_FIELDS = {
+    'patient_id': 1, 'description': 1, 'location': 1, 'status': 1,
+    'priority': 1, 'priority_level': 1, 'created_at': 1
+}
+
+
+def priority_level(document):
+    level = document.get('priority_level')
+    if level is None:
+        level = PRIORITY_LEVELS.get(document.get('priority'), PRIORITY_LEVELS['medium'])
+    return level
+
+
+def backfill_priority_levels(collection):
+    """
+    Set priority_level on emergencies stored before it existed.
+    """
+    updated = 0
+    for label, level in PRIORITY_LEVELS.items():
+        result = collection.update_many(
+            {'priority': label, 'priority_level': {'$exists': False}},
+            {'$set': {'priority_level': level}}
+        )
+        updated += result.modified_count
+    return updated
+
+
+class TriageQueue:
+    """
+    In-process heap view of open (pending) emergencies, ordered for
+    dispatch. Push is O(log n) and discard is O(1); removed entries are
+    left in the heap and dropped when they reach the top, and the heap is
+    compacted once they dominate. Peeking at the next k pops and re-pushes
+    them, O(k log n).
+
+    Each worker keeps its own view, so it is reloaded from MongoDB every
+    refresh_interval seconds to pick up changes made by other processes.
+    """
+
+    def __init__(self, collection_getter, refresh_interval=30, clock=time.monotonic):
+        self._collection_getter = collection_getter
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._loaded_at = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _entry(self, document):
+        created_at = document.get('created_at') or datetime.min
+        return [-priority_level(document), created_at, next(self._counter), document]
+
+    def _push(self, document):
+        key = str(document['_id'])
+        entry = self._entry(document)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+    def load(self):
+        """
+        Rebuild the view from MongoDB with one indexed query.
+        """
+        documents = self._collection_getter().find({'status': OPEN_STATUS}, QUEUE_FIELDS).sort(QUEUE_SORT)
+        with self._lock:
+            self._heap = []
+            self._entries = {}
+            for document in documents:
+                self._push(document)
+            self._loaded_at = self._clock()
+
+    def _ensure_fresh(self):
+        if self._loaded_at is None or self._clock() - self._loaded_at > self.refresh_interval:
+            self.load()
+
+    def add(self, document):
+        """
+        Track a newly created or reopened emergency.
+        """
+        if document.get('status', OPEN_STATUS) != OPEN_STATUS:
+            return self.discard(document['_id'])
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._discard(str(document['_id']))
+            self._push(document)
+
+    def discard(self, emergency_id):
+        with self._lock:
+            self._discard(str(emergency_id))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[-1] = None
+            self._compact()
+
+    def peek(self, n):
+        """
+        The next n emergencies in dispatch order, without removing them.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            head = []
+            while self._heap and len(head) < n:
+                entry = heapq.heappop(self._heap)
+                # Discarded entries popped here are gone for good
+                if entry[-1] is not None:
+                    head.append(entry)
+            for entry in head:
+                heapq.heappush(self._heap, entry)
+            return [entry[-1] for entry in head]
+
+    def clear(self):
+        with self._lock:
+            self._heap = []
+            self._entries = {}
+            self._loaded_at = None
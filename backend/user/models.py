@@ -1,6 +1,6 @@
 from flask import Flask, jsonify, request, session, redirect
 from passlib.hash import pbkdf2_sha256
-from auth import db, create_token
+from auth import db, create_token, invalidate_user, token_subject
 import uuid
 import datetime
 
@@ -51,6 +51,7 @@ class User:
       return jsonify({'error': str(e)}), 500
   
   def signout(self):
+    invalidate_user(token_subject() or session.get('user', {}).get('_id'))
     session.clear()
     return redirect('/')
   
@@ -0,0 +1,19 @@
+"""
+WSGI entry point for production; see gunicorn.conf.py.
+
+Importing this module loads the model and datasets. With preload_app the
+master does that once before forking, so every worker shares the same
+pages copy-on-write instead of loading its own copy.
+"""
+import gc
+
+from app import app
+from inference import get_engine
+
+get_engine()
+
+# Move everything loaded so far out of the collector's reach, so GC passes
+# in the workers do not write to (and so copy) the shared pages
+gc.freeze()
+
+application = app